@@ -1,8 +1,18 @@
 import os
 import sys
+import json
 import time
+import atexit
+import queue
+import asyncio
+import sqlite3
+import hashlib
 import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import httplib2
 import googleapiclient.discovery
+from cachetools import TTLCache
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
 
@@ -24,17 +34,273 @@ if not YOUTUBE_API_KEY:
 # -----------------------------
 # Step 2: Initialize YouTube API
 # -----------------------------
+# One persistent HTTP client: keeps the TLS connection warm across tool calls and
+# honours ETag/Cache-Control through an on-disk response cache
+HTTP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache")
+http = httplib2.Http(cache=HTTP_CACHE_DIR, timeout=10)
 youtube = googleapiclient.discovery.build(
-    "youtube", "v3", developerKey=YOUTUBE_API_KEY
+    "youtube", "v3", developerKey=YOUTUBE_API_KEY, http=http
 )
 
+# Short-lived cache of Data API responses: repeat lookups within 5 min skip the HTTPS round trip
+API_CACHE_TTL = 300  # seconds
+_api_cache = TTLCache(maxsize=1024, ttl=API_CACHE_TTL)
+_api_cache_lock = threading.Lock()
+
+
+def _cached_execute(key: tuple, request) -> dict:
+    """request.execute(), memoized under key (endpoint, part, id) for API_CACHE_TTL seconds."""
+    with _api_cache_lock:
+        response = _api_cache.get(key)
+    if response is None:
+        response = request.execute()
+        with _api_cache_lock:
+            _api_cache[key] = response
+    return response
+
+
+VIDEOS_LIST_MAX_IDS = 50  # videos.list accepts up to 50 comma-separated ids per call
+
+
+def _get_video_items(video_ids: list[str]) -> dict:
+    """snippet+statistics items by video id: cache hits first, then one videos.list per 50 misses."""
+    items, missing = {}, []
+    with _api_cache_lock:
+        for video_id in dict.fromkeys(video_ids):
+            cached = _api_cache.get(("videos", "snippet,statistics", video_id))
+            if cached is None:
+                missing.append(video_id)
+            elif cached.get("items"):
+                items[video_id] = cached["items"][0]
+
+    for start in range(0, len(missing), VIDEOS_LIST_MAX_IDS):
+        batch = missing[start:start + VIDEOS_LIST_MAX_IDS]
+        response = youtube.videos().list(
+            part="snippet,statistics",
+            id=",".join(batch)
+        ).execute()
+        found = {item["id"]: item for item in response.get("items", [])}
+        with _api_cache_lock:
+            # Cache per id in the single-video response shape so get_video_details hits too
+            for video_id in batch:
+                _api_cache[("videos", "snippet,statistics", video_id)] = {
+                    "items": [found[video_id]] if video_id in found else []
+                }
+        items.update(found)
+    return items
+
 # -----------------------------
 # Step 3: Initialize Vector DB
 # -----------------------------
-model = SentenceTransformer("all-MiniLM-L6-v2")
+USE_GPU = faiss.get_num_gpus() > 0
+
+if USE_GPU:
+    # FP16 PyTorch weights on the same GPU as the FAISS index
+    model = SentenceTransformer("all-MiniLM-L6-v2", device="cuda", model_kwargs={"torch_dtype": "float16"})
+else:
+    # int8-quantized ONNX Runtime weights: VNNI/AVX-512 int8 matmuls on CPU, 4x smaller model
+    try:
+        model = SentenceTransformer(
+            "all-MiniLM-L6-v2",
+            backend="onnx",
+            model_kwargs={"file_name": "onnx/model_qint8_avx512_vnni.onnx"}
+        )
+    except Exception as e:
+        print(f"ONNX backend unavailable ({e}), falling back to PyTorch", file=sys.stderr, flush=True)
+        model = SentenceTransformer("all-MiniLM-L6-v2")
 dimension = 384  # embedding size for MiniLM model
-index = faiss.IndexFlatL2(dimension)
-video_store = []  # store metadata
+
+HNSW_M = 32  # graph neighbours per node
+_gpu_res = faiss.StandardGpuResources() if USE_GPU else None
+
+
+def _to_gpu(cpu_index):
+    """Copy a CPU index onto GPU 0 with FP16 vector storage."""
+    options = faiss.GpuClonerOptions()
+    options.useFloat16 = True
+    return faiss.index_cpu_to_gpu(_gpu_res, 0, cpu_index, options)
+
+
+def _new_base_index():
+    """Empty FAISS index: FP16 brute force on GPU when available, FP16 HNSW graph on CPU.
+
+    Embeddings are L2-normalized, so inner product == cosine similarity (what MiniLM is trained for).
+    """
+    if USE_GPU:
+        # HNSW has no GPU implementation; a GPU scan is still far faster than the CPU graph
+        return _to_gpu(faiss.IndexFlatIP(dimension))
+
+    # HNSW graph index: sub-linear search instead of a brute-force scan over every vector.
+    # Vectors are stored as FP16 (768 B instead of 1.5 KB each) to halve the bytes touched per query.
+    cpu_index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_fp16, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    cpu_index.hnsw.efConstruction = 80
+    cpu_index.hnsw.efSearch = 64
+    return cpu_index
+
+
+def _new_index():
+    """_new_base_index wrapped in an IndexIDMap: search labels are explicit video_store row ids,
+    so they stay valid across restarts and if the underlying index is ever rebuilt."""
+    return faiss.IndexIDMap(_new_base_index())
+
+
+# Past PQ_MIN_TRAIN vectors the CPU index is re-encoded as IVF-PQ: 48 B/vector instead of 768 B
+PQ_MIN_TRAIN = 10_000  # enough samples to train 256 IVF centroids and 48x256 PQ codebooks
+PQ_NLIST = 256
+PQ_M = 48  # sub-vectors of 8 dims, one byte each
+PQ_NPROBE = 16
+
+
+def _is_compressed(idx) -> bool:
+    return isinstance(faiss.downcast_index(idx.index), faiss.IndexIVFPQ)
+
+
+index = _new_index()
+# Chunk metadata as parallel columns (struct-of-arrays); row i describes index vector i.
+# Full transcripts live in sqlite (see Step 3.a) and are referenced by transcript_id.
+STORE_FIELDS = ("title", "video_id", "url", "start_time", "chunk_text", "transcript_id")
+video_store = {field: [] for field in STORE_FIELDS}
+
+# MiniLM truncates at 256 tokens: embed transcripts as overlapping windows of timed segments
+CHUNK_SEGMENTS = 30  # segments per window (~200 tokens)
+CHUNK_OVERLAP = 5
+TRANSCRIPT_FETCH_WORKERS = 8  # concurrent transcript downloads in bulk_index_channel_videos
+
+# A single worker thread owns the index: it applies buffered adds and runs searches, so
+# FAISS never sees an add concurrently with a search.
+# Concurrent semantic_search calls are coalesced into one encode + one index.search
+SEARCH_BATCH_WINDOW = 0.005  # seconds to wait for more queries after the first one
+SEARCH_BATCH_SIZE = 32
+PENDING_FLUSH_SIZE = 256  # buffered vectors that trigger one batched index.add (no per-vector resize)
+PENDING_FLUSH_INTERVAL = 1.0  # seconds of idle before a partial buffer is flushed anyway
+_index_queue = queue.Queue()
+_FLUSH = object()  # queue sentinel: apply pending adds
+_pending_adds = []  # (embeddings, entries) waiting for the worker
+_pending_count = 0
+_pending_lock = threading.Lock()
+
+# LRU cache of embeddings keyed by blake2b(text), stored as FP16 bytes to fit 2x more entries
+EMBEDDING_CACHE_SIZE = 4096
+_embedding_cache = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+# -----------------------------
+# Step 3.a: Persist Vector DB
+# -----------------------------
+# Index + metadata survive restarts, so bulk_index_channel_videos doesn't have to be re-run
+STORE_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_PATH = os.path.join(STORE_DIR, "faiss.index")
+STORE_PATH = os.path.join(STORE_DIR, "video_store.json")
+TRANSCRIPTS_PATH = os.path.join(STORE_DIR, "transcripts.sqlite3")
+PERSIST_DELAY = 5.0  # seconds; bursts of adds are coalesced into one write
+
+_index_lock = threading.Lock()  # held by the index worker and by _persist
+_persist_lock = threading.Lock()
+_persist_timer = None
+
+
+# Transcripts are only read for return_full_transcript=True, so keep them on disk, not in RAM
+_transcripts_db = sqlite3.connect(TRANSCRIPTS_PATH, check_same_thread=False)
+_transcripts_db.execute("CREATE TABLE IF NOT EXISTS transcripts (id INTEGER PRIMARY KEY, text TEXT)")
+_transcripts_db.commit()
+_transcripts_lock = threading.Lock()
+
+
+def _store_transcripts(entries: list[dict]):
+    """Move each entry's transcript into sqlite, leaving a transcript_id; chunks of one video share a row."""
+    rows = {}  # id(text) -> (text, row id); holding text keeps its id() stable
+    with _transcripts_lock:
+        for entry in entries:
+            text = entry.pop("transcript")
+            if id(text) not in rows:
+                cursor = _transcripts_db.execute("INSERT INTO transcripts (text) VALUES (?)", (text,))
+                rows[id(text)] = (text, cursor.lastrowid)
+            entry["transcript_id"] = rows[id(text)][1]
+        _transcripts_db.commit()
+
+
+def _load_transcript(transcript_id: int) -> str:
+    with _transcripts_lock:
+        row = _transcripts_db.execute("SELECT text FROM transcripts WHERE id = ?", (transcript_id,)).fetchone()
+    return row[0] if row else None
+
+
+def _dump_store() -> dict:
+    """JSON-friendly snapshot of video_store; call under _index_lock.
+
+    The columns are copied: json.dump runs after the lock is released, while the
+    index worker keeps extending the live lists one column at a time.
+    """
+    return {"columns": {field: list(column) for field, column in video_store.items()}}
+
+
+def _load_store(data: dict) -> dict:
+    store = {field: list(data["columns"][field]) for field in STORE_FIELDS}
+    if len({len(column) for column in store.values()}) > 1:
+        raise ValueError("video_store columns have different lengths")
+    return store
+
+
+def _persist():
+    """Write the index and video_store to disk atomically."""
+    global _persist_timer
+    with _persist_lock:
+        _persist_timer = None
+
+    try:
+        with _index_lock:
+            cpu_index = faiss.index_gpu_to_cpu(index) if USE_GPU else index
+            faiss.write_index(cpu_index, INDEX_PATH + ".tmp")
+            store = _dump_store()
+        with open(STORE_PATH + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(store, f)
+        os.replace(INDEX_PATH + ".tmp", INDEX_PATH)
+        os.replace(STORE_PATH + ".tmp", STORE_PATH)
+    except Exception as e:
+        print(f"Failed to persist vector DB: {e}", file=sys.stderr, flush=True)
+
+
+def _schedule_persist():
+    """Debounced _persist: one write per PERSIST_DELAY window instead of an fsync per add."""
+    global _persist_timer
+    with _persist_lock:
+        if _persist_timer is None:
+            _persist_timer = threading.Timer(PERSIST_DELAY, _persist)
+            _persist_timer.daemon = True
+            _persist_timer.start()
+
+
+@atexit.register
+def _flush_persist():
+    with _index_lock:
+        _flush_pending()
+    with _persist_lock:
+        pending = _persist_timer
+    if pending is not None:
+        pending.cancel()
+        _persist()
+
+
+if os.path.exists(INDEX_PATH) and os.path.exists(STORE_PATH):
+    try:
+        loaded_index = faiss.read_index(INDEX_PATH)
+        with open(STORE_PATH, encoding="utf-8") as f:
+            loaded_store = _load_store(json.load(f))
+        if loaded_index.metric_type != faiss.METRIC_INNER_PRODUCT:
+            raise ValueError("index was built with the old L2 metric")
+        if not isinstance(loaded_index, faiss.IndexIDMap):
+            raise ValueError("index was built without stable row ids")
+        if loaded_index.ntotal != len(loaded_store["title"]):
+            raise ValueError(f"{loaded_index.ntotal} vectors but {len(loaded_store['title'])} metadata rows")
+        if USE_GPU:
+            try:
+                loaded_index = _to_gpu(loaded_index)
+            except RuntimeError:
+                pass  # index type without a GPU implementation (e.g. HNSW saved on a CPU host)
+        index, video_store = loaded_index, loaded_store
+        print(f"Loaded {loaded_index.ntotal} indexed chunks from {INDEX_PATH}", file=sys.stderr, flush=True)
+    except Exception as e:
+        print(f"Ignoring saved vector DB: {e}", file=sys.stderr, flush=True)
 
 # -----------------------------
 # Step 4: Create MCP Server
@@ -91,7 +357,7 @@ def get_channel_stats(channel_id: str = DEFAULT_CHANNEL_ID) -> dict:
         part="statistics",
         id=channel_id
     )
-    response = request.execute()
+    response = _cached_execute(("channels", "statistics", channel_id), request)
 
     if "items" not in response or not response["items"]:
         return {"error": "Channel not found"}
@@ -163,33 +429,32 @@ def get_video_details(video_id: str) -> dict:
     """Get detailed information about a video including title, description, and stats."""
     try:
         # Get video details
-        request = youtube.videos().list(
-            part="snippet,statistics",
-            id=video_id
-        )
-        response = request.execute()
-
-        if "items" not in response or not response["items"]:
+        item = _get_video_items([video_id]).get(video_id)
+        if item is None:
             return {"error": "Video not found"}
 
-        item = response["items"][0]
-        snippet = item["snippet"]
-        stats = item["statistics"]
-
-        return {
-            "title": snippet["title"],
-            "description": snippet["description"],
-            "channel": snippet["channelTitle"],
-            "published": snippet["publishedAt"],
-            "views": stats.get("viewCount", "0"),
-            "likes": stats.get("likeCount", "0"),
-            "comments": stats.get("commentCount", "0"),
-            "url": f"https://www.youtube.com/watch?v={video_id}"
-        }
+        return _video_details(video_id, item)
     except Exception as e:
         return {"error": str(e)}
 
 
+def _video_details(video_id: str, item: dict) -> dict:
+    """get_video_details result for a videos.list item."""
+    snippet = item["snippet"]
+    stats = item["statistics"]
+
+    return {
+        "title": snippet["title"],
+        "description": snippet["description"],
+        "channel": snippet["channelTitle"],
+        "published": snippet["publishedAt"],
+        "views": stats.get("viewCount", "0"),
+        "likes": stats.get("likeCount", "0"),
+        "comments": stats.get("commentCount", "0"),
+        "url": f"https://www.youtube.com/watch?v={video_id}"
+    }
+
+
 @mcp.tool()
 def get_video_stats(video_id: str) -> dict:
     """Fetch view count, like count, and comment count for a specific video."""
@@ -198,7 +463,7 @@ def get_video_stats(video_id: str) -> dict:
             part="statistics",
             id=video_id
         )
-        response = request.execute()
+        response = _cached_execute(("videos", "statistics", video_id), request)
 
         if "items" not in response or not response["items"]:
             return {"error": "Video not found"}
@@ -218,35 +483,27 @@ def get_video_stats(video_id: str) -> dict:
 @mcp.tool()
 def compare_video_stats(video_ids: list[str]) -> list[dict]:
     """Compare stats across multiple videos to find which has most views/likes/comments."""
+    try:
+        # One videos.list call per 50 ids instead of one per video
+        items = _get_video_items(video_ids)
+    except Exception as e:
+        return [{"video_id": video_id, "error": str(e)} for video_id in video_ids]
+
     results = []
-    
     for video_id in video_ids:
-        try:
-            request = youtube.videos().list(
-                part="snippet,statistics",
-                id=video_id
-            )
-            response = request.execute()
-
-            if "items" in response and response["items"]:
-                item = response["items"][0]
-                snippet = item["snippet"]
-                stats = item["statistics"]
-                
-                results.append({
-                    "video_id": video_id,
-                    "title": snippet["title"],
-                    "views": int(stats.get("viewCount", 0)),
-                    "likes": int(stats.get("likeCount", 0)),
-                    "comments": int(stats.get("commentCount", 0)),
-                    "url": f"https://www.youtube.com/watch?v={video_id}"
-                })
-        except Exception as e:
+        if video_id in items:
+            snippet = items[video_id]["snippet"]
+            stats = items[video_id]["statistics"]
+
             results.append({
                 "video_id": video_id,
-                "error": str(e)
+                "title": snippet["title"],
+                "views": int(stats.get("viewCount", 0)),
+                "likes": int(stats.get("likeCount", 0)),
+                "comments": int(stats.get("commentCount", 0)),
+                "url": f"https://www.youtube.com/watch?v={video_id}"
             })
-    
+
     return results
 
 
@@ -273,24 +530,22 @@ def search_and_analyze_videos(query: str, max_results: int = 10) -> dict:
         # First search for videos
         search_results = search_youtube(query, max_results)
         
-        # Get detailed stats for each video
-        analyzed_videos = []
-        for video in search_results:
-            video_details = get_video_details(video["video_id"])
-            if "error" not in video_details:
-                analyzed_videos.append(video_details)
-        
-        # Sort by different metrics
-        by_views = sorted(analyzed_videos, key=lambda x: int(x.get("views", 0)), reverse=True)
-        by_likes = sorted(analyzed_videos, key=lambda x: int(x.get("likes", 0)), reverse=True)
-        by_comments = sorted(analyzed_videos, key=lambda x: int(x.get("comments", 0)), reverse=True)
+        # Get detailed stats for all videos in one batched videos.list call
+        video_ids = [video["video_id"] for video in search_results]
+        items = _get_video_items(video_ids)
+        analyzed_videos = [_video_details(video_id, items[video_id]) for video_id in video_ids if video_id in items]
         
+        # Top video per metric: single O(N) pass each instead of a full sort
+        most_viewed = max(analyzed_videos, key=lambda x: int(x.get("views", 0)), default=None)
+        most_liked = max(analyzed_videos, key=lambda x: int(x.get("likes", 0)), default=None)
+        most_commented = max(analyzed_videos, key=lambda x: int(x.get("comments", 0)), default=None)
+
         return {
             "query": query,
             "total_videos": len(analyzed_videos),
-            "most_viewed": by_views[0] if by_views else None,
-            "most_liked": by_likes[0] if by_likes else None,
-            "most_commented": by_comments[0] if by_comments else None,
+            "most_viewed": most_viewed,
+            "most_liked": most_liked,
+            "most_commented": most_commented,
             "all_videos": analyzed_videos
         }
     except Exception as e:
@@ -300,41 +555,231 @@ def search_and_analyze_videos(query: str, max_results: int = 10) -> dict:
 # -----------------------------
 # Step 6: FAISS Tools
 # -----------------------------
+def _encode(texts: list[str]) -> np.ndarray:
+    """Normalized float32 (n, dimension) embeddings; only texts missing from the LRU cache hit the model."""
+    keys = [hashlib.blake2b(text.encode()).digest() for text in texts]
+    embeddings = np.empty((len(texts), dimension), dtype=np.float32)
+    missing = []
+    with _embedding_cache_lock:
+        for i, key in enumerate(keys):
+            cached = _embedding_cache.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                _embedding_cache.move_to_end(key)
+                embeddings[i] = np.frombuffer(cached, dtype=np.float16)
+
+    if missing:
+        fresh = model.encode([texts[i] for i in missing], batch_size=32, convert_to_numpy=True, normalize_embeddings=True)
+        with _embedding_cache_lock:
+            for i, embedding in zip(missing, fresh):
+                embeddings[i] = embedding
+                _embedding_cache[keys[i]] = embedding.astype(np.float16).tobytes()
+                if len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+                    _embedding_cache.popitem(last=False)
+    return embeddings
+
+
+def _add_to_index(texts: list[str], entries: list[dict]):
+    """Embed texts in one batched forward pass and queue them for the index worker."""
+    global _pending_count
+    if not texts:
+        return
+    embeddings = _encode(texts)
+    _store_transcripts(entries)
+    with _pending_lock:
+        _pending_adds.append((embeddings, entries))
+        _pending_count += len(texts)
+        full = _pending_count >= PENDING_FLUSH_SIZE
+    if full:
+        _index_queue.put(_FLUSH)
+
+
+def _flush_pending():
+    """Apply buffered adds with one batched add_with_ids. Caller holds _index_lock."""
+    global _pending_count
+    with _pending_lock:
+        if not _pending_adds:
+            return
+        pending = list(_pending_adds)
+        _pending_adds.clear()
+        _pending_count = 0
+
+    # _encode already yields C-contiguous float32, so no conversion copy before FAISS
+    embeddings = pending[0][0] if len(pending) == 1 else np.vstack([embeddings for embeddings, _ in pending])
+    first_row = len(video_store["title"])
+    index.add_with_ids(embeddings, np.arange(first_row, first_row + len(embeddings), dtype=np.int64))
+    for _, entries in pending:
+        for field in STORE_FIELDS:
+            video_store[field].extend([entry.get(field) for entry in entries])
+    _maybe_compress()
+    _schedule_persist()
+
+
+def _maybe_compress():
+    """Re-encode the CPU index as IVF-PQ once it is big enough to train. Caller holds _index_lock."""
+    global index
+    if USE_GPU or index.ntotal < PQ_MIN_TRAIN or _is_compressed(index):
+        return
+
+    print(f"Compressing {index.ntotal} vectors to IVF-PQ...", file=sys.stderr, flush=True)
+    vectors = faiss.downcast_index(index.index).reconstruct_n(0, index.ntotal)
+    ids = faiss.vector_to_array(index.id_map)
+    quantizer = faiss.IndexFlatIP(dimension)
+    ivfpq = faiss.IndexIVFPQ(quantizer, dimension, PQ_NLIST, PQ_M, 8, faiss.METRIC_INNER_PRODUCT)
+    ivfpq.train(vectors)
+    ivfpq.nprobe = PQ_NPROBE
+    compressed = faiss.IndexIDMap(ivfpq)
+    compressed.add_with_ids(vectors, ids)
+    index = compressed
+
+
+def _fetch_transcript(video_id: str, video_details: dict = None) -> dict:
+    """Fetch video details (unless given) and transcript text without indexing them."""
+    try:
+        # Get video details first
+        if video_details is None:
+            video_details = get_video_details(video_id)
+        if "error" in video_details:
+            return video_details
+
+        # Get transcript
+        transcript_data = YouTubeTranscriptApi.fetch(video_id)
+        transcript_text = " ".join([t["text"] for t in transcript_data])
+
+        return {
+            "title": video_details["title"],
+            "transcript": transcript_text,
+            "video_id": video_id,
+            "url": video_details["url"],
+            "segments": transcript_data
+        }
+
+    except Exception as e:
+        error_msg = str(e)
+        if "Subtitles are disabled" in error_msg:
+            return {"error": f"Transcript not available for {video_id}: Subtitles disabled by uploader"}
+        elif "No transcripts found" in error_msg:
+            return {"error": f"Transcript not available for {video_id}: No captions found"}
+        else:
+            return {"error": f"Transcript not available for {video_id}: {error_msg}"}
+
+
+def _chunk_transcript(fetched: dict) -> tuple[list[str], list[dict]]:
+    """Split a fetched transcript into overlapping segment windows (texts + video_store entries)."""
+    segments = fetched["segments"]
+    step = CHUNK_SEGMENTS - CHUNK_OVERLAP
+    texts, entries = [], []
+    for start in range(0, len(segments), step):
+        window = segments[start:start + CHUNK_SEGMENTS]
+        chunk_text = " ".join([t["text"] for t in window])
+        texts.append(chunk_text)
+        entries.append({
+            "title": fetched["title"],
+            "transcript": fetched["transcript"],  # shared reference, not a copy
+            "video_id": fetched["video_id"],
+            "url": fetched["url"],
+            "start_time": window[0]["start"],
+            "chunk_text": chunk_text
+        })
+        if start + CHUNK_SEGMENTS >= len(segments):
+            break
+    return texts, entries
+
+
 @mcp.tool()
 def index_video(title: str, transcript: str, video_id: str = None):
     """Index a video transcript/description for semantic search."""
-    embedding = model.encode([transcript])
-    index.add(np.array(embedding, dtype=np.float32))
-    video_store.append({
-        "title": title, 
+    _add_to_index([transcript], [{
+        "title": title,
         "transcript": transcript,
         "video_id": video_id
-    })
+    }])
     print(f"Indexed video: {title}", file=sys.stderr, flush=True)
     return {"status": "indexed", "title": title}
 
 
+def _search_batch(batch: list[tuple]):
+    """One batched encode and one FAISS search for queued queries. Caller holds _index_lock."""
+    try:
+        total = len(video_store["title"])
+        if total == 0:
+            for _, _, future in batch:
+                future.set_result(None)
+            return
+
+        queries = [query for query, _, _ in batch]
+        embeddings = _encode(queries)
+        k = min(max(top_k for _, top_k, _ in batch), total)
+        D, I = index.search(embeddings, k)
+        for row, (_, top_k, future) in enumerate(batch):
+            future.set_result((D[row, :top_k], I[row, :top_k]))
+    except Exception as e:
+        for _, _, future in batch:
+            future.set_exception(e)
+
+
+def _index_worker():
+    """Sole user of the FAISS index: flushes buffered adds, then serves micro-batched searches."""
+    while True:
+        try:
+            item = _index_queue.get(timeout=PENDING_FLUSH_INTERVAL)
+        except queue.Empty:
+            item = _FLUSH
+
+        batch = [] if item is _FLUSH else [item]
+        if batch:
+            deadline = time.monotonic() + SEARCH_BATCH_WINDOW
+            while len(batch) < SEARCH_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = _index_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is not _FLUSH:
+                    batch.append(item)
+
+        with _index_lock:
+            try:
+                # Searches always see everything indexed before they were issued
+                _flush_pending()
+            except Exception as e:
+                print(f"Failed to add vectors to the index: {e}", file=sys.stderr, flush=True)
+            if batch:
+                _search_batch(batch)
+
+
+threading.Thread(target=_index_worker, daemon=True).start()
+
+
 @mcp.tool()
-def semantic_search(query: str, top_k: int = 3, return_full_transcript: bool = False):
+async def semantic_search(query: str, top_k: int = 3, return_full_transcript: bool = False):
     """Search indexed transcripts/comments by meaning."""
-    if len(video_store) == 0:
+    future = Future()
+    _index_queue.put((query, top_k, future))
+    hits = await asyncio.wrap_future(future)
+    if hits is None:
         return {"error": "No videos indexed yet. Use index_video first."}
+    D, I = hits
 
-    query_embedding = model.encode([query])
-    D, I = index.search(np.array(query_embedding, dtype=np.float32), min(top_k, len(video_store)))
-    
+    titles, video_ids, urls = video_store["title"], video_store["video_id"], video_store["url"]
+    start_times, chunk_texts = video_store["start_time"], video_store["chunk_text"]
     results = []
-    for i, idx in enumerate(I[0]):
-        if idx < len(video_store):  # Valid index
+    for score, idx in zip(D.tolist(), I.tolist()):
+        if 0 <= idx < len(titles):  # Valid index (HNSW pads missing hits with -1)
             video_data = {
-                "title": video_store[idx]["title"],
-                "video_id": video_store[idx]["video_id"],
-                "url": video_store[idx].get("url"),
-                # Convert FAISS distance → % similarity
-                "similarity_score": round((1 / (1 + D[0][i])) * 100, 2)
+                "title": titles[idx],
+                "video_id": video_ids[idx],
+                "url": urls[idx],
+                "start_time": start_times[idx],
+                "chunk_text": chunk_texts[idx],
+                # Inner product of unit vectors is already cosine similarity
+                "similarity_score": round(score * 100, 2)
             }
             if return_full_transcript:
-                video_data["transcript"] = video_store[idx]["transcript"]
+                video_data["transcript"] = _load_transcript(video_store["transcript_id"][idx])
             results.append(video_data)
     
     print(f"Semantic search performed for: {query} | full_transcript={return_full_transcript}", file=sys.stderr, flush=True)
@@ -344,43 +789,26 @@ def semantic_search(query: str, top_k: int = 3, return_full_transcript: bool = F
 @mcp.tool()
 def fetch_and_index_transcript(video_id: str):
     """Fetch transcript of a YouTube video (if available) and index it into FAISS."""
-    try:
-        # Get video details first
-        video_details = get_video_details(video_id)
-        if "error" in video_details:
-            return video_details
-        
-        # Get transcript
-        transcript_data = YouTubeTranscriptApi.fetch(video_id)
-        transcript_text = " ".join([t["text"] for t in transcript_data])
-
-        # Create embedding & store
-        embedding = model.encode([transcript_text])
-        index.add(np.array(embedding, dtype=np.float32))
-        video_store.append({
-            "title": video_details["title"], 
-            "transcript": transcript_text,
-            "video_id": video_id,
-            "url": video_details["url"]
-        })
+    fetched = _fetch_transcript(video_id)
+    if "error" in fetched:
+        return fetched
 
-        print(f"Transcript fetched and indexed for video: {video_id}", file=sys.stderr, flush=True)
+    try:
+        # Create chunk embeddings & store
+        texts, entries = _chunk_transcript(fetched)
+        _add_to_index(texts, entries)
+    except Exception as e:
+        return {"error": f"Failed to index transcript for {video_id}: {str(e)}"}
 
-        return {
-            "status": "indexed", 
-            "video_id": video_id, 
-            "title": video_details["title"],
-            "transcript_length": len(transcript_text)
-        }
+    print(f"Transcript fetched and indexed for video: {video_id}", file=sys.stderr, flush=True)
 
-    except Exception as e:
-        error_msg = str(e)
-        if "Subtitles are disabled" in error_msg:
-            return {"error": f"Transcript not available for {video_id}: Subtitles disabled by uploader"}
-        elif "No transcripts found" in error_msg:
-            return {"error": f"Transcript not available for {video_id}: No captions found"}
-        else:
-            return {"error": f"Transcript not available for {video_id}: {error_msg}"}
+    return {
+        "status": "indexed",
+        "video_id": video_id,
+        "title": fetched["title"],
+        "transcript_length": len(fetched["transcript"]),
+        "chunks": len(texts)
+    }
 
 
 @mcp.tool()
@@ -391,18 +819,37 @@ def bulk_index_channel_videos(channel_id: str = DEFAULT_CHANNEL_ID, max_videos:
         videos = get_latest_videos_from_channel(channel_id, max_videos)
         if isinstance(videos, dict) and "error" in videos:
             return videos
-        
+
         indexed_count = 0
         failed_count = 0
-        
-        for video in videos:
-            result = fetch_and_index_transcript(video["video_id"])
+        texts, entries = [], []
+
+        # Details for every video in one batched call, made here because the API client isn't thread-safe
+        video_ids = [video["video_id"] for video in videos]
+        items = _get_video_items(video_ids)
+        details = {
+            video_id: _video_details(video_id, items[video_id]) if video_id in items else {"error": "Video not found"}
+            for video_id in video_ids
+        }
+
+        # Phase 1: collect transcripts; downloads are I/O-bound so they run concurrently
+        with ThreadPoolExecutor(max_workers=TRANSCRIPT_FETCH_WORKERS) as executor:
+            fetched = list(executor.map(lambda video_id: _fetch_transcript(video_id, details[video_id]), video_ids))
+
+        for video, result in zip(videos, fetched):
             if "error" in result:
                 failed_count += 1
                 print(f"Failed to index {video['title']}: {result['error']}", file=sys.stderr)
             else:
                 indexed_count += 1
-        
+                chunk_texts, chunk_entries = _chunk_transcript(result)
+                texts.extend(chunk_texts)
+                entries.extend(chunk_entries)
+
+        # Phase 2: one batched encode + add instead of a forward pass per video
+        if texts:
+            _add_to_index(texts, entries)
+
         return {
             "status": "completed",
             "indexed": indexed_count,
@@ -438,8 +885,10 @@ def main():
     print("- bulk_index_channel_videos", file=sys.stderr, flush=True)
     print("Press CTRL+C to stop the server.\n", file=sys.stderr, flush=True)
 
-    threading.Thread(target=heartbeat, daemon=True).start()
+    # Debug-only: the periodic wakeup + flushed stderr write adds noise to search latency
+    if os.getenv("MCP_DEBUG"):
+        threading.Thread(target=heartbeat, daemon=True).start()
     mcp.run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,15 +1,26 @@
 import os
 import sys
 import time
+import atexit
+import pickle
+import queue
+import random
+import hashlib
+import inspect
+import logging
+import functools
 import threading
+import logging.handlers
+from concurrent.futures import ThreadPoolExecutor
+import httplib2
 import googleapiclient.discovery
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
+from cachetools import TTLCache
 
 # New imports for semantic search
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api.formatters import TextFormatter
 
@@ -22,20 +33,225 @@ YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 if not YOUTUBE_API_KEY:
     raise ValueError("⚠️ YOUTUBE_API_KEY is missing! Please add it to your .env file.")
 
+# -----------------------------
+# Step 1.a: Logging
+# -----------------------------
+# Tools only enqueue records; a background listener does the stderr writes, so
+# concurrent requests don't serialize on the stderr lock
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stderr))
+_log_listener.start()
+atexit.register(_log_listener.stop)  # registered first, so it runs last and drains everything
+
+log = logging.getLogger("youtube-mcp")
+log.addHandler(logging.handlers.QueueHandler(_log_queue))
+log.setLevel(logging.INFO)
+log.propagate = False
+
 # -----------------------------
 # Step 2: Initialize YouTube API
 # -----------------------------
+HTTP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache")
+_http_local = threading.local()
+
+
+def _http() -> httplib2.Http:
+    """This thread's keep-alive connection pool; httplib2.Http is not thread-safe, so never share one."""
+    http = getattr(_http_local, "http", None)
+    if http is None:
+        http = _http_local.http = httplib2.Http(cache=HTTP_CACHE_DIR, timeout=10)
+    return http
+
+
 youtube = googleapiclient.discovery.build(
-    "youtube", "v3", developerKey=YOUTUBE_API_KEY
+    "youtube", "v3", developerKey=YOUTUBE_API_KEY, http=_http()
 )
 
+# Partial-response masks: the API only sends back the fields the tools read
+VIDEO_FIELDS = "items(id,snippet(title,description,channelTitle,publishedAt),statistics(viewCount,likeCount,commentCount))"
+VIDEO_STATS_FIELDS = "items/statistics(viewCount,likeCount,commentCount)"
+SEARCH_VIDEO_FIELDS = "items(id/videoId,snippet(title,description,channelTitle,publishedAt))"
+SEARCH_CHANNEL_FIELDS = "items/snippet(channelId,title)"
+CHANNEL_STATS_FIELDS = "items/statistics(subscriberCount,viewCount,videoCount)"
+COMMENT_FIELDS = "items/snippet/topLevelComment/snippet(authorDisplayName,textDisplay,likeCount,publishedAt)"
+
+API_CACHE_TTL = 300  # seconds; view/like counts drift, so keep this short
+TRANSCRIPT_CACHE_TTL = 24 * 3600  # transcripts rarely change once published
+
+
+def _freeze(value):
+    """Make list arguments (e.g. languages) usable as cache keys."""
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _ttl_cached(ttl: int, maxsize: int = 1024):
+    """Memoize a tool on its arguments for ttl seconds. Error results are never cached."""
+    def decorator(func):
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        lock = threading.Lock()
+        sig = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Key on the bound arguments, so f(x) and f(x=x, opt=None) share one entry
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple((name, _freeze(value)) for name, value in bound.arguments.items())
+            with lock:
+                result = cache.get(key)
+            if result is None:
+                result = func(*args, **kwargs)
+                if not (isinstance(result, dict) and "error" in result):
+                    with lock:
+                        cache[key] = result
+            return result
+        return wrapper
+    return decorator
+
 # -----------------------------
 # Step 3: Initialize Vector DB
 # -----------------------------
-model = SentenceTransformer("all-MiniLM-L6-v2")
+# The model is loaded on first use (and warmed in the background by main()) so
+# startup and the non-embedding tools don't wait on it
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    global _model
+    with _model_lock:
+        if _model is None:
+            # Imported here: pulling in torch is most of the model's startup cost
+            from sentence_transformers import SentenceTransformer
+            # int8-quantized ONNX Runtime weights: VNNI/AVX-512 int8 matmuls on CPU, 4x smaller model
+            try:
+                _model = SentenceTransformer(
+                    "all-MiniLM-L6-v2",
+                    backend="onnx",
+                    model_kwargs={"file_name": "onnx/model_qint8_avx512_vnni.onnx"}
+                )
+            except Exception as e:
+                log.warning(f"ONNX backend unavailable ({e}), falling back to PyTorch")
+                _model = SentenceTransformer("all-MiniLM-L6-v2")
+        return _model
+
+
 dimension = 384  # embedding size for MiniLM model
-index = faiss.IndexFlatL2(dimension)
-video_store = []  # store metadata
+# Embeddings are L2-normalized, so inner product == cosine similarity.
+# IndexIDMap2 keys vectors by a stable int64 hash of the video instead of insertion position.
+# Vectors are stored as fp16, halving the memory each search has to stream.
+def _new_flat_index():
+    return faiss.IndexIDMap2(
+        faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+    )
+
+
+index = _new_flat_index()  # exact search while the corpus is small
+video_meta: dict[int, dict] = {}  # vector id -> metadata
+
+
+def _vector_id(key: str) -> int:
+    """Stable signed 64-bit id for a video (FAISS ids are int64)."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big", signed=True)
+
+# Past HNSW_THRESHOLD vectors the flat index is swapped for an HNSW graph
+HNSW_THRESHOLD = 1000
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 40
+HNSW_EF_SEARCH = 16
+
+# Raw embeddings, kept so the index can be rebuilt without re-encoding transcripts
+EMBEDDINGS_GROW_CHUNK = 1024
+embeddings = np.empty((EMBEDDINGS_GROW_CHUNK, dimension), dtype=np.float32)
+
+# Past GPU_THRESHOLD vectors searches run on an exact fp16 GPU copy. `index` stays the
+# CPU source of truth (adds, persistence); the GPU copy is kept in step with it.
+GPU_THRESHOLD = 10_000
+_gpu_res = faiss.StandardGpuResources() if faiss.get_num_gpus() > 0 else None
+gpu_index = None
+
+
+def _maybe_to_gpu():
+    """Mirror the index onto the GPU once it is large enough for the GPU to win."""
+    global gpu_index
+    if _gpu_res is None or gpu_index is not None or index.ntotal <= GPU_THRESHOLD:
+        return
+    config = faiss.GpuIndexFlatConfig()
+    config.useFloat16 = True
+    gpu_index = faiss.IndexIDMap2(faiss.GpuIndexFlatIP(_gpu_res, dimension, config))
+    gpu_index.add_with_ids(embeddings[:index.ntotal], faiss.vector_to_array(index.id_map))
+    log.info(f"Mirrored {index.ntotal} vectors to GPU")
+
+# -----------------------------
+# Step 3.a: Persist Vector DB
+# -----------------------------
+STORE_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_PATH = os.path.join(STORE_DIR, "youtube_index.faiss")
+STORE_PATH = os.path.join(STORE_DIR, "youtube_store.pkl")
+PERSIST_DELAY = 5.0  # seconds; a burst of adds is written once, this long after the first
+
+# Held while the index is mutated, and while the persist timer snapshots it
+_index_lock = threading.RLock()
+_persist_lock = threading.Lock()
+_persist_timer = None
+
+
+def _persist():
+    """Write the index and metadata to disk atomically."""
+    global _persist_timer
+    with _persist_lock:
+        _persist_timer = None
+
+    try:
+        # Write to temp files and rename so a crash mid-write never leaves a torn snapshot
+        with _index_lock:
+            faiss.write_index(index, INDEX_PATH + ".tmp")
+            store = {"video_meta": dict(video_meta), "embeddings": embeddings[:index.ntotal].copy()}
+        with open(STORE_PATH + ".tmp", "wb") as f:
+            pickle.dump(store, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(INDEX_PATH + ".tmp", INDEX_PATH)
+        os.replace(STORE_PATH + ".tmp", STORE_PATH)
+    except Exception as e:
+        log.error(f"Failed to persist vector DB: {e}")
+
+
+def _schedule_persist():
+    """Debounced _persist: one write per PERSIST_DELAY window; adds after it fires schedule the next."""
+    global _persist_timer
+    with _persist_lock:
+        if _persist_timer is None:
+            _persist_timer = threading.Timer(PERSIST_DELAY, _persist)
+            _persist_timer.daemon = True
+            _persist_timer.start()
+
+
+@atexit.register
+def _flush_persist():
+    with _persist_lock:
+        pending = _persist_timer
+    if pending is not None:
+        pending.cancel()
+        _persist()
+
+
+if os.path.exists(INDEX_PATH) and os.path.exists(STORE_PATH):
+    try:
+        loaded_index = faiss.read_index(INDEX_PATH)
+        with open(STORE_PATH, "rb") as f:
+            loaded = pickle.load(f)
+        if not isinstance(loaded_index, faiss.IndexIDMap2) or loaded_index.metric_type != faiss.METRIC_INNER_PRODUCT:
+            raise ValueError("unexpected index type")
+        if loaded_index.ntotal != len(loaded["video_meta"]):
+            raise ValueError("index and metadata are out of sync")
+        index = loaded_index
+        video_meta = loaded["video_meta"]
+        capacity = -(-max(index.ntotal, 1) // EMBEDDINGS_GROW_CHUNK) * EMBEDDINGS_GROW_CHUNK
+        embeddings = np.empty((capacity, dimension), dtype=np.float32)
+        embeddings[:index.ntotal] = loaded["embeddings"]
+        log.info(f"Loaded {index.ntotal} indexed chunks from disk")
+    except Exception as e:
+        log.warning(f"Ignoring saved vector DB: {e}")
+    _maybe_to_gpu()
 
 # -----------------------------
 # Step 4: Create MCP Server
@@ -48,6 +264,7 @@ mcp = FastMCP("YouTube-MCP")
 
 # Default channel lock 
 DEFAULT_CHANNEL_ID = "UCX6OQ3DkcsbYNE6H8uQQuVA"
+WATCH_URL_PREFIX = "https://www.youtube.com/watch?v="
 # -----------------------------
 # Step 5: YouTube API Tools
 # -----------------------------
@@ -59,46 +276,43 @@ def search_youtube(query: str, max_results: int = 5) -> list[dict]:
         q=query,
         maxResults=max_results,
         type="video",
-        order="relevance"
+        order="relevance",
+        fields=SEARCH_VIDEO_FIELDS
     )
-    response = request.execute()
-
-    results = []
-    for item in response.get("items", []):
-        title = item["snippet"]["title"]
-        video_id = item["id"]["videoId"]
-        url = f"https://www.youtube.com/watch?v={video_id}"
-        channel = item["snippet"]["channelTitle"]
-        published = item["snippet"]["publishedAt"]
-        description = item["snippet"]["description"]
-        
-        results.append({
-            "title": title,
-            "video_id": video_id,
-            "url": url,
-            "channel": channel,
-            "published": published,
-            "description": description
-        })
+    response = request.execute(http=_http())
+
+    results = [
+        {
+            "title": item["snippet"]["title"],
+            "video_id": item["id"]["videoId"],
+            "url": WATCH_URL_PREFIX + item["id"]["videoId"],
+            "channel": item["snippet"]["channelTitle"],
+            "published": item["snippet"]["publishedAt"],
+            "description": item["snippet"]["description"]
+        }
+        for item in response.get("items", [])
+    ]
 
-    print(f"Served keyword search: {query}", file=sys.stderr, flush=True)
+    log.info(f"Served keyword search: {query}")
     return results
 
 
 @mcp.tool()
+@_ttl_cached(API_CACHE_TTL)
 def get_channel_stats(channel_id: str = DEFAULT_CHANNEL_ID) -> dict:
     """Get channel subscriber, view, and video count stats."""
     request = youtube.channels().list(
         part="statistics",
-        id=channel_id
+        id=channel_id,
+        fields=CHANNEL_STATS_FIELDS
     )
-    response = request.execute()
+    response = request.execute(http=_http())
 
     if "items" not in response or not response["items"]:
         return {"error": "Channel not found"}
 
     stats = response["items"][0]["statistics"]
-    print(f"Fetched channel stats for {channel_id}", file=sys.stderr, flush=True)
+    log.info(f"Fetched channel stats for {channel_id}")
     return {
         "subscribers": stats.get("subscriberCount"),
         "views": stats.get("viewCount"),
@@ -115,9 +329,10 @@ def get_channel_id_by_username(username: str) -> dict:
             part="snippet",
             q=username,
             type="channel",
-            maxResults=1
+            maxResults=1,
+            fields=SEARCH_CHANNEL_FIELDS
         )
-        response = request.execute()
+        response = request.execute(http=_http())
         
         if response.get("items"):
             channel_id = response["items"][0]["snippet"]["channelId"]
@@ -138,68 +353,93 @@ def get_latest_videos_from_channel(channel_id: str = DEFAULT_CHANNEL_ID, max_res
             channelId=channel_id,
             type="video",
             order="date",
-            maxResults=max_results
+            maxResults=max_results,
+            fields=SEARCH_VIDEO_FIELDS
         )
-        response = request.execute()
+        response = request.execute(http=_http())
 
-        results = []
-        for item in response.get("items", []):
-            video_data = {
+        results = [
+            {
                 "title": item["snippet"]["title"],
                 "video_id": item["id"]["videoId"],
-                "url": f"https://www.youtube.com/watch?v={item['id']['videoId']}",
+                "url": WATCH_URL_PREFIX + item["id"]["videoId"],
                 "published": item["snippet"]["publishedAt"],
                 "description": item["snippet"]["description"]
             }
-            results.append(video_data)
+            for item in response.get("items", [])
+        ]
 
-        print(f"Fetched latest videos for channel {channel_id}", file=sys.stderr, flush=True)
+        log.info(f"Fetched latest videos for channel {channel_id}")
         return results
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
+@_ttl_cached(API_CACHE_TTL)
 def get_video_details(video_id: str) -> dict:
     """Get detailed information about a video including title, description, and stats."""
     try:
         # Get video details
         request = youtube.videos().list(
             part="snippet,statistics",
-            id=video_id
+            id=video_id,
+            fields=VIDEO_FIELDS
         )
-        response = request.execute()
+        response = request.execute(http=_http())
 
         if "items" not in response or not response["items"]:
             return {"error": "Video not found"}
 
-        item = response["items"][0]
-        snippet = item["snippet"]
-        stats = item["statistics"]
-
-        return {
-            "title": snippet["title"],
-            "description": snippet["description"],
-            "channel": snippet["channelTitle"],
-            "published": snippet["publishedAt"],
-            "views": stats.get("viewCount", "0"),
-            "likes": stats.get("likeCount", "0"),
-            "comments": stats.get("commentCount", "0"),
-            "url": f"https://www.youtube.com/watch?v={video_id}"
-        }
+        return _video_details(video_id, response["items"][0])
     except Exception as e:
         return {"error": str(e)}
 
 
+VIDEOS_LIST_MAX_IDS = 50  # videos().list accepts at most 50 comma-separated ids
+
+
+def _get_video_items(video_ids: list[str]) -> dict:
+    """Fetch snippet+statistics for many videos, 50 ids per request. Returns {video_id: item}."""
+    items = {}
+    for start in range(0, len(video_ids), VIDEOS_LIST_MAX_IDS):
+        batch = video_ids[start:start + VIDEOS_LIST_MAX_IDS]
+        response = youtube.videos().list(
+            part="snippet,statistics",
+            id=",".join(batch),
+            fields=VIDEO_FIELDS
+        ).execute(http=_http())
+        for item in response.get("items", []):
+            items[item["id"]] = item
+    return items
+
+
+def _video_details(video_id: str, item: dict) -> dict:
+    snippet = item["snippet"]
+    stats = item["statistics"]
+    return {
+        "title": snippet["title"],
+        "description": snippet["description"],
+        "channel": snippet["channelTitle"],
+        "published": snippet["publishedAt"],
+        "views": stats.get("viewCount", "0"),
+        "likes": stats.get("likeCount", "0"),
+        "comments": stats.get("commentCount", "0"),
+        "url": WATCH_URL_PREFIX + video_id
+    }
+
+
 @mcp.tool()
+@_ttl_cached(API_CACHE_TTL)
 def get_video_stats(video_id: str) -> dict:
     """Fetch view count, like count, and comment count for a specific video."""
     try:
         request = youtube.videos().list(
             part="statistics",
-            id=video_id
+            id=video_id,
+            fields=VIDEO_STATS_FIELDS
         )
-        response = request.execute()
+        response = request.execute(http=_http())
 
         if "items" not in response or not response["items"]:
             return {"error": "Video not found"}
@@ -219,40 +459,35 @@ def get_video_stats(video_id: str) -> dict:
 @mcp.tool()
 def compare_video_stats(video_ids: list[str]) -> list[dict]:
     """Compare stats across multiple videos to find which has most views/likes/comments."""
+    try:
+        items = _get_video_items(video_ids)
+    except Exception as e:
+        return [{"video_id": video_id, "error": str(e)} for video_id in video_ids]
+
     results = []
-    
     for video_id in video_ids:
-        try:
-            request = youtube.videos().list(
-                part="snippet,statistics",
-                id=video_id
-            )
-            response = request.execute()
-
-            if "items" in response and response["items"]:
-                item = response["items"][0]
-                snippet = item["snippet"]
-                stats = item["statistics"]
-                
-                results.append({
-                    "video_id": video_id,
-                    "title": snippet["title"],
-                    "views": int(stats.get("viewCount", 0)),
-                    "likes": int(stats.get("likeCount", 0)),
-                    "comments": int(stats.get("commentCount", 0)),
-                    "url": f"https://www.youtube.com/watch?v={video_id}"
-                })
-        except Exception as e:
-            results.append({
-                "video_id": video_id,
-                "error": str(e)
-            })
-    
+        item = items.get(video_id)
+        if item is None:
+            results.append({"video_id": video_id, "error": "Video not found"})
+            continue
+        snippet = item["snippet"]
+        stats = item["statistics"]
+
+        results.append({
+            "video_id": video_id,
+            "title": snippet["title"],
+            "views": int(stats.get("viewCount", 0)),
+            "likes": int(stats.get("likeCount", 0)),
+            "comments": int(stats.get("commentCount", 0)),
+            "url": WATCH_URL_PREFIX + video_id
+        })
+
     return results
 
 
 
 @mcp.tool()
+@_ttl_cached(TRANSCRIPT_CACHE_TTL)
 def check_transcript_availability(video_id: str = None) -> dict:
     """Check what transcripts are available for a video without fetching them."""
     if not video_id:
@@ -261,15 +496,15 @@ def check_transcript_availability(video_id: str = None) -> dict:
     try:
         transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
 
-        available_transcripts = []
-        for transcript in transcript_list:
-            transcript_info = {
+        available_transcripts = [
+            {
                 "language": transcript.language,
                 "language_code": transcript.language_code,
                 "is_generated": transcript.is_generated,
                 "is_translatable": transcript.is_translatable
             }
-            available_transcripts.append(transcript_info)
+            for transcript in transcript_list
+        ]
 
         return {
             "video_id": video_id,
@@ -286,6 +521,7 @@ def check_transcript_availability(video_id: str = None) -> dict:
 
 
 @mcp.tool()
+@_ttl_cached(TRANSCRIPT_CACHE_TTL, maxsize=256)
 def get_video_transcript(video_id: str = None, languages: list[str] = None) -> dict:
     """
     Fetch transcript of a YouTube video with better error handling.
@@ -343,24 +579,26 @@ def search_and_analyze_videos(query: str, max_results: int = 10) -> dict:
         # First search for videos
         search_results = search_youtube(query, max_results)
         
-        # Get detailed stats for each video
-        analyzed_videos = []
-        for video in search_results:
-            video_details = get_video_details(video["video_id"])
-            if "error" not in video_details:
-                analyzed_videos.append(video_details)
+        # Get detailed stats for all videos in one batched request
+        video_ids = [video["video_id"] for video in search_results]
+        items = _get_video_items(video_ids)
+        analyzed_videos = [_video_details(video_id, items[video_id]) for video_id in video_ids if video_id in items]
         
-        # Sort by different metrics
-        by_views = sorted(analyzed_videos, key=lambda x: int(x.get("views", 0)), reverse=True)
-        by_likes = sorted(analyzed_videos, key=lambda x: int(x.get("likes", 0)), reverse=True)
-        by_comments = sorted(analyzed_videos, key=lambda x: int(x.get("comments", 0)), reverse=True)
+        # Parse each count once, then take the top video per metric
+        parsed = [
+            (video, int(video.get("views", 0)), int(video.get("likes", 0)), int(video.get("comments", 0)))
+            for video in analyzed_videos
+        ]
+        most_viewed = max(parsed, key=lambda p: p[1], default=(None,))[0]
+        most_liked = max(parsed, key=lambda p: p[2], default=(None,))[0]
+        most_commented = max(parsed, key=lambda p: p[3], default=(None,))[0]
         
         return {
             "query": query,
             "total_videos": len(analyzed_videos),
-            "most_viewed": by_views[0] if by_views else None,
-            "most_liked": by_likes[0] if by_likes else None,
-            "most_commented": by_comments[0] if by_comments else None,
+            "most_viewed": most_viewed,
+            "most_liked": most_liked,
+            "most_commented": most_commented,
             "all_videos": analyzed_videos
         }
     except Exception as e:
@@ -370,44 +608,242 @@ def search_and_analyze_videos(query: str, max_results: int = 10) -> dict:
 # -----------------------------
 # Step 6: FAISS Tools
 # -----------------------------
+ENCODE_BATCH_SIZE = 32
+# MiniLM truncates at 256 tokens (~1000 chars), so transcripts are embedded as overlapping passages
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+
+
+def _chunk(text: str, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> list[str]:
+    chunks = []
+    for start in range(0, len(text), size - overlap):
+        chunks.append(text[start:start + size])
+        if start + size >= len(text):
+            break  # this window reached the end; another would sit inside it
+    return chunks
+
+
+def _video_key(meta: dict) -> str:
+    """Vector id namespace of a video. Without a video_id the transcript digest is part of it,
+    so two different videos that share a title don't collapse into one."""
+    if meta["video_id"]:
+        return meta["video_id"]
+    digest = hashlib.blake2b(meta["transcript"].encode(), digest_size=8).hexdigest()
+    return f"{meta['title']}#{digest}"
+
+
+def _chunk_ids(key: str) -> list[int]:
+    """Ids of the chunks currently indexed for a video (chunk ids run consecutively from 0)."""
+    ids = []
+    while True:
+        vid_id = _vector_id(f"{key}:{len(ids)}")
+        if vid_id not in video_meta:
+            return ids
+        ids.append(vid_id)
+
+
+def _index_status(key: str, meta: dict) -> str:
+    """"indexed" for a new video, "already_indexed" if it is stored unchanged, else "reindexed"."""
+    old = _chunk_ids(key)
+    if not old:
+        return "indexed"
+    stored = video_meta[old[0]]
+    unchanged = stored["transcript"] == meta["transcript"] and stored["title"] == meta["title"]
+    return "already_indexed" if unchanged else "reindexed"
+
+
+def _remove_vectors(ids: list[int]):
+    """Drop vectors and their metadata by id, compacting the embedding matrix to match.
+
+    The flat index removes in place (keeping the order of the remaining rows). HNSW can't,
+    so it is rebuilt from the kept rows; the GPU mirror has no remove either and is re-mirrored.
+    """
+    global index, gpu_index
+    remove = np.asarray(ids, dtype=np.int64)
+    all_ids = faiss.vector_to_array(index.id_map)
+    keep = ~np.isin(all_ids, remove)
+    n_kept = int(keep.sum())
+    embeddings[:n_kept] = embeddings[:index.ntotal][keep]  # boolean indexing copies the rows first
+    if isinstance(faiss.downcast_index(index.index), faiss.IndexHNSW):
+        index = _new_flat_index()
+        index.add_with_ids(embeddings[:n_kept], all_ids[keep])
+        _maybe_upgrade_index()
+    else:
+        index.remove_ids(remove)
+    for vid_id in ids:
+        video_meta.pop(vid_id, None)
+    if gpu_index is not None:
+        gpu_index = None
+        _maybe_to_gpu()
+
+
+def _encode_and_add(texts: list[str], metas: list[dict]) -> list[str]:
+    """Chunk texts, embed all chunks in one batched forward pass and add them with their metadata.
+
+    Returns one _index_status per input. Unchanged videos are skipped; a changed one has its
+    old chunks removed before the new ones are added. Within a batch the last entry per video wins.
+    """
+    keys = [_video_key(meta) for meta in metas]
+    latest = {key: pos for pos, key in enumerate(keys)}
+    statuses, new_ids, stale_ids = [], {}, []
+    with _index_lock:
+        for pos, (text, meta, key) in enumerate(zip(texts, metas, keys)):
+            status = _index_status(key, meta)
+            statuses.append(status)
+            if latest[key] != pos or status == "already_indexed":
+                continue
+            if status == "reindexed":
+                stale_ids.extend(_chunk_ids(key))
+            for chunk_idx, chunk_text in enumerate(_chunk(text)):
+                new_ids[_vector_id(f"{key}:{chunk_idx}")] = (chunk_text, {**meta, "chunk_idx": chunk_idx, "chunk_text": chunk_text})
+        if not new_ids and not stale_ids:
+            return statuses
+        if new_ids:
+            chunk_texts = [text for text, _ in new_ids.values()]
+            # Encode straight into the preallocated rows of the embedding matrix; the slice is a
+            # contiguous view, so normalization and index.add need no further copies.
+            # Rows past index.ntotal aren't part of the index yet, so if encoding raises,
+            # nothing (including a re-indexed video's old chunks) has been touched.
+            new_embeddings = _reserve_embeddings(len(chunk_texts))
+            new_embeddings[:] = get_model().encode(chunk_texts, batch_size=ENCODE_BATCH_SIZE, convert_to_numpy=True, show_progress_bar=False)
+            faiss.normalize_L2(new_embeddings)
+        if stale_ids:
+            _remove_vectors(stale_ids)
+            if new_ids:
+                # Compaction shrank ntotal: slide the encoded rows down to follow the kept ones
+                moved = embeddings[index.ntotal:index.ntotal + len(new_embeddings)]
+                moved[:] = new_embeddings  # overlapping ranges; numpy copies through a temporary
+                new_embeddings = moved
+        if new_ids:
+            ids = np.fromiter(new_ids, dtype=np.int64, count=len(new_ids))
+            index.add_with_ids(new_embeddings, ids)
+            if gpu_index is not None:
+                gpu_index.add_with_ids(new_embeddings, ids)
+            for vid_id, (_, meta) in new_ids.items():
+                video_meta[vid_id] = meta
+            _maybe_upgrade_index()
+            _maybe_to_gpu()
+    _schedule_persist()
+    return statuses
+
+
+def _reserve_embeddings(n: int) -> np.ndarray:
+    """Return the next n free rows of the embedding matrix, growing it in EMBEDDINGS_GROW_CHUNK steps."""
+    global embeddings
+    start = index.ntotal
+    end = start + n
+    if end > len(embeddings):
+        capacity = -(-end // EMBEDDINGS_GROW_CHUNK) * EMBEDDINGS_GROW_CHUNK
+        grown = np.empty((capacity, dimension), dtype=np.float32)
+        grown[:start] = embeddings[:start]
+        embeddings = grown
+    return embeddings[start:end]
+
+
+PENDING_FLUSH_SIZE = 64
+_pending_texts = []
+_pending_metas = []
+
+
+@atexit.register
+def _flush_pending():
+    """Embed and add everything index_video has buffered."""
+    if not _pending_texts:
+        return
+    n = len(_pending_texts)
+    _encode_and_add(_pending_texts[:n], _pending_metas[:n])
+    # Dropped only once they are in the index: if encoding fails they stay queued for the next flush
+    del _pending_texts[:n]
+    del _pending_metas[:n]
+
+
+def _maybe_upgrade_index():
+    """Swap the flat index for HNSW once the corpus outgrows brute-force search."""
+    global index
+    if index.ntotal <= HNSW_THRESHOLD or isinstance(faiss.downcast_index(index.index), faiss.IndexHNSW):
+        return
+    hnsw = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_fp16, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    hnsw.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    hnsw.hnsw.efSearch = HNSW_EF_SEARCH
+    new_index = faiss.IndexIDMap2(hnsw)
+    # Rows of the embedding matrix are in the same order as the id map
+    new_index.add_with_ids(embeddings[:index.ntotal], faiss.vector_to_array(index.id_map))
+    index = new_index
+    log.info(f"Switched to HNSW index at {index.ntotal} vectors")
+
+
 @mcp.tool()
 def index_video(title: str, transcript: str, video_id: str = None):
     """Index a video transcript/description for semantic search."""
-    embedding = model.encode([transcript])
-    index.add(np.array(embedding, dtype=np.float32))
-    video_store.append({
-        "title": title, 
+    meta = {
+        "title": title,
         "transcript": transcript,
         "video_id": video_id
-    })
-    print(f"Indexed video: {title}", file=sys.stderr, flush=True)
-    return {"status": "indexed", "title": title}
+    }
+    key = _video_key(meta)
+    with _index_lock:
+        status = _index_status(key, meta)
+    if status == "already_indexed" and not any(_video_key(m) == key for m in _pending_metas):
+        return {"status": status, "title": title}
+    # Buffered so a run of index_video calls is embedded in one batch; searches flush first
+    _pending_texts.append(transcript)
+    _pending_metas.append(meta)
+    if len(_pending_texts) >= PENDING_FLUSH_SIZE:
+        _flush_pending()
+    log.info(f"Indexed video: {title}")
+    return {"status": status, "title": title}
+
+
+QUERY_CACHE_SIZE = 1024
+SEARCH_OVERFETCH = 4
+
+
+@functools.lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _encode_query(query: str) -> bytes:
+    """Normalized query embedding, cached as immutable bytes so repeat queries skip the model."""
+    embedding = np.ascontiguousarray(get_model().encode([query], convert_to_numpy=True), dtype=np.float32)
+    faiss.normalize_L2(embedding)
+    return embedding.tobytes()
 
 
 @mcp.tool()
 def semantic_search(query: str, top_k: int = 3, return_full_transcript: bool = False):
     """Search indexed transcripts/comments by meaning."""
-    if len(video_store) == 0:
+    _flush_pending()
+    if len(video_meta) == 0:
         return {"error": "No videos indexed yet. Use index_video first."}
 
-    query_embedding = model.encode([query])
-    D, I = index.search(np.array(query_embedding, dtype=np.float32), min(top_k, len(video_store)))
+    query_embedding = np.frombuffer(_encode_query(query), dtype=np.float32).reshape(1, dimension)
+    # Hits are chunks; over-fetch so top_k distinct videos survive de-duplication
+    # The query is normalized on CPU in _encode_query; only the search itself runs on the GPU
+    search_index = gpu_index if gpu_index is not None else index
+    D, I = search_index.search(query_embedding, min(top_k * SEARCH_OVERFETCH, len(video_meta)))
     
     results = []
+    seen_videos = set()
     for i, idx in enumerate(I[0]):
-        if idx < len(video_store):  # Valid index
-            video_data = {
-                "title": video_store[idx]["title"],
-                "video_id": video_store[idx]["video_id"],
-                "url": video_store[idx].get("url"),
-                # Convert FAISS distance → % similarity
-                "similarity_score": round((1 / (1 + D[0][i])) * 100, 2)
-            }
-            if return_full_transcript:
-                video_data["transcript"] = video_store[idx]["transcript"]
-            results.append(video_data)
+        meta = video_meta.get(int(idx))  # -1 / unknown ids mean no hit
+        if meta is None:
+            continue
+        video_key = _video_key(meta)
+        if video_key in seen_videos:
+            continue  # results are score-ordered, so the first chunk seen is the video's best
+        seen_videos.add(video_key)
+        video_data = {
+            "title": meta["title"],
+            "video_id": meta["video_id"],
+            "url": meta.get("url"),
+            "matched_text": meta["chunk_text"],
+            # Cosine similarity → %
+            "similarity_score": round(float(D[0][i]) * 100, 2)
+        }
+        if return_full_transcript:
+            video_data["transcript"] = meta["transcript"]
+        results.append(video_data)
+        if len(results) == top_k:
+            break
     
-    print(f"Semantic search performed for: {query} | full_transcript={return_full_transcript}", file=sys.stderr, flush=True)
+    log.info(f"Semantic search performed for: {query} | full_transcript={return_full_transcript}")
     return results
 
 
@@ -428,19 +864,17 @@ def fetch_and_index_transcript(video_id: str, languages: list[str] = None):
         transcript_text = transcript_result["transcript"]
 
         # Create embedding & store
-        embedding = model.encode([transcript_text])
-        index.add(np.array(embedding, dtype=np.float32))
-        video_store.append({
-            "title": video_details["title"], 
+        status = _encode_and_add([transcript_text], [{
+            "title": video_details["title"],
             "transcript": transcript_text,
             "video_id": video_id,
             "url": video_details["url"]
-        })
+        }])[0]
 
-        print(f"Transcript fetched and indexed for video: {video_id}", file=sys.stderr, flush=True)
+        log.info(f"Transcript fetched and indexed for video: {video_id}")
 
         return {
-            "status": "indexed", 
+            "status": status,
             "video_id": video_id, 
             "title": video_details["title"],
             "transcript_length": len(transcript_text),
@@ -451,6 +885,26 @@ def fetch_and_index_transcript(video_id: str, languages: list[str] = None):
         return {"error": f"Failed to fetch and index transcript for {video_id}: {str(e)}"}
 
 
+TRANSCRIPT_FETCH_WORKERS = 8
+FETCH_JITTER = 0.05  # seconds; spreads out request bursts to stay clear of rate limits
+
+
+def _check_one(video_id: str) -> dict:
+    """Thread-pool worker: check transcript availability for one video."""
+    time.sleep(random.uniform(0, FETCH_JITTER))
+    return check_transcript_availability(video_id)
+
+
+def _fetch_one(video_id: str) -> dict:
+    """Thread-pool worker: fetch the transcript for one video.
+
+    No availability pre-check: get_video_transcript already reports a missing
+    transcript as an error, so checking first would only add a round-trip.
+    """
+    time.sleep(random.uniform(0, FETCH_JITTER))
+    return get_video_transcript(video_id)
+
+
 @mcp.tool()
 def bulk_index_channel_videos(channel_id: str = DEFAULT_CHANNEL_ID, max_videos: int = 10):
     """Fetch and index transcripts for multiple videos from a channel with detailed reporting."""
@@ -463,39 +917,45 @@ def bulk_index_channel_videos(channel_id: str = DEFAULT_CHANNEL_ID, max_videos:
         indexed_count = 0
         failed_count = 0
         results = []
-        
-        for video in videos:
-            # First check if transcript is available
-            availability = check_transcript_availability(video["video_id"])
-            
-            if availability.get("has_transcripts", False):
-                # Try to fetch and index
-                result = fetch_and_index_transcript(video["video_id"])
-                if "error" in result:
-                    failed_count += 1
-                    results.append({
-                        "video_id": video["video_id"],
-                        "title": video["title"],
-                        "status": "failed",
-                        "error": result["error"]
-                    })
-                else:
-                    indexed_count += 1
-                    results.append({
-                        "video_id": video["video_id"],
-                        "title": video["title"],
-                        "status": "indexed",
-                        "transcript_length": result.get("transcript_length", 0)
-                    })
-            else:
+        staged_texts = []
+        staged_metas = []
+
+        # Phase 1: fetch transcripts concurrently, staging the successful ones
+        with ThreadPoolExecutor(max_workers=TRANSCRIPT_FETCH_WORKERS) as executor:
+            fetched = list(executor.map(_fetch_one, [video["video_id"] for video in videos]))
+
+        for video, result in zip(videos, fetched):
+            if "error" in result:
                 failed_count += 1
                 results.append({
                     "video_id": video["video_id"],
                     "title": video["title"],
                     "status": "no_transcript",
-                    "error": "No transcripts available"
+                    "error": result["error"]
                 })
-        
+            else:
+                indexed_count += 1
+                staged_texts.append(result["transcript"])
+                staged_metas.append({
+                    "title": video["title"],
+                    "transcript": result["transcript"],
+                    "video_id": video["video_id"],
+                    "url": video["url"]
+                })
+                results.append({
+                    "video_id": video["video_id"],
+                    "title": video["title"],
+                    "status": "indexed",
+                    "transcript_length": result.get("length", 0)
+                })
+
+        # Phase 2: embed every staged transcript in one batch
+        statuses = _encode_and_add(staged_texts, staged_metas)
+        staged_results = [r for r in results if r["status"] == "indexed"]
+        for result, status in zip(staged_results, statuses):
+            result["status"] = status
+        log.info(f"Bulk indexed {indexed_count} videos for channel {channel_id}")
+
         return {
             "status": "completed",
             "indexed": indexed_count,
@@ -523,9 +983,11 @@ def find_videos_with_transcripts(query: str = None, channel_id: str = None, max_
             return videos
         
         videos_with_transcripts = []
-        
-        for video in videos:
-            availability = check_transcript_availability(video["video_id"])
+
+        with ThreadPoolExecutor(max_workers=TRANSCRIPT_FETCH_WORKERS) as executor:
+            availabilities = list(executor.map(_check_one, [video["video_id"] for video in videos]))
+
+        for video, availability in zip(videos, availabilities):
             if availability.get("has_transcripts", False):
                 video_info = video.copy()
                 video_info["transcript_info"] = availability["available_transcripts"]
@@ -540,53 +1002,55 @@ def find_videos_with_transcripts(query: str = None, channel_id: str = None, max_
         return {"error": str(e)}
 
 @mcp.tool()
+@_ttl_cached(API_CACHE_TTL)
 def get_video_comments(video_id: str, max_results: int = 50) -> list[dict]:
     """Fetch top-level comments for a video."""
     request = youtube.commentThreads().list(
         part="snippet",
         videoId=video_id,
         maxResults=max_results,
-        textFormat="plainText"
+        textFormat="plainText",
+        fields=COMMENT_FIELDS
     )
-    response = request.execute()
-    results = []
-    for item in response.get("items", []):
-        snippet = item["snippet"]["topLevelComment"]["snippet"]
-        results.append({
+    response = request.execute(http=_http())
+    return [
+        {
             "author": snippet["authorDisplayName"],
             "text": snippet["textDisplay"],
             "likes": snippet["likeCount"],
             "published": snippet["publishedAt"]
-        })
-    return results
+        }
+        for snippet in (item["snippet"]["topLevelComment"]["snippet"] for item in response.get("items", []))
+    ]
 # -----------------------------
 # Step 7: Run MCP Server
 # -----------------------------
 def heartbeat():
     while True:
-        print("Server alive, waiting for requests...", file=sys.stderr, flush=True)
+        log.info("Server alive, waiting for requests...")
         time.sleep(30)
 
 def main():
-    print("YouTube MCP Server started", file=sys.stderr, flush=True)
-    print("Available tools:", file=sys.stderr, flush=True)
-    print("- search_youtube", file=sys.stderr, flush=True)
-    print("- get_channel_stats", file=sys.stderr, flush=True)
-    print("- get_channel_id_by_username", file=sys.stderr, flush=True)
-    print("- get_latest_videos_from_channel", file=sys.stderr, flush=True)
-    print("- get_video_details", file=sys.stderr, flush=True)
-    print("- get_video_stats", file=sys.stderr, flush=True)
-    print("- compare_video_stats", file=sys.stderr, flush=True)
-    print("- get_video_transcript", file=sys.stderr, flush=True)
-    print("- check_transcript_availability", file=sys.stderr, flush=True)
-    print("- search_and_analyze_videos", file=sys.stderr, flush=True)
-    print("- semantic_search", file=sys.stderr, flush=True)
-    print("- fetch_and_index_transcript", file=sys.stderr, flush=True)
-    print("- bulk_index_channel_videos", file=sys.stderr, flush=True)
-    print("- find_videos_with_transcripts", file=sys.stderr, flush=True)
-    print("Press CTRL+C to stop the server.\n", file=sys.stderr, flush=True)
+    log.info("YouTube MCP Server started")
+    log.info("Available tools:")
+    log.info("- search_youtube")
+    log.info("- get_channel_stats")
+    log.info("- get_channel_id_by_username")
+    log.info("- get_latest_videos_from_channel")
+    log.info("- get_video_details")
+    log.info("- get_video_stats")
+    log.info("- compare_video_stats")
+    log.info("- get_video_transcript")
+    log.info("- check_transcript_availability")
+    log.info("- search_and_analyze_videos")
+    log.info("- semantic_search")
+    log.info("- fetch_and_index_transcript")
+    log.info("- bulk_index_channel_videos")
+    log.info("- find_videos_with_transcripts")
+    log.info("Press CTRL+C to stop the server.")
 
     threading.Thread(target=heartbeat, daemon=True).start()
+    threading.Thread(target=get_model, daemon=True).start()  # warm the model while serving API calls
     mcp.run()
 
 if __name__ == "__main__":
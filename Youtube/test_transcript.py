@@ -1,3 +1,4 @@
+import asyncio
 import importlib
 import sys
 
@@ -48,6 +49,8 @@ def run_tests():
     if hasattr(server, "semantic_search"):
         print("\n📚 Semantic Search (metadata only):")
         sem = server.semantic_search("gaming challenge", top_k=2, return_full_transcript=False)
+        if asyncio.iscoroutine(sem):
+            sem = asyncio.run(sem)
         print(sem)
 
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
+import asyncio
 from server_2 import (
     search_youtube,
     get_channel_stats,
@@ -42,7 +43,7 @@ def run_tests():
     print(transcript)
 
     print("\n📚 Semantic Search (metadata only):")
-    sem_results = semantic_search("learn python basics", top_k=2)
+    sem_results = asyncio.run(semantic_search("learn python basics", top_k=2))
     print(sem_results)
 
     print("\n📊 Compare Video Stats:")
@@ -1,10 +1,9 @@
 # ~/mcp-gdrive/app.py
 import io, os, textwrap, streamlit as st
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
-from pdfminer.high_level import extract_text as pdf_extract_text
+import fitz  # PyMuPDF
 from docx import Document as DocxDocument
 
 # ---------- CONFIG ----------
@@ -20,10 +19,26 @@ def _drive():
     return build("drive", "v3", credentials=c)
 
 def _download(req) -> bytes:
-    buf = io.BytesIO()
-    MediaIoBaseDownload(buf, req).next_chunk()
-    return buf.getvalue()
+    # One GET straight into a bytes body: no BytesIO staging buffer or getvalue() copy,
+    # and no silent truncation at MediaIoBaseDownload's 100 MB first chunk
+    return req.execute()
+
+def _pdf_to_text(data: bytes) -> str:
+    """Page text via PyMuPDF; stops reading pages once MAX_BYTES characters are collected."""
+    parts, total = [], 0
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        for page in doc:
+            text = page.get_text("text")
+            parts.append(text)
+            total += len(text)
+            if total >= MAX_BYTES:
+                break
+    return "\n".join(parts)[:MAX_BYTES]
 
+# Streamlit reruns the script on every interaction; cache Drive reads across reruns.
+# Extracted text is keyed by id + modifiedTime, so an edited file is re-read.
+@st.cache_data(ttl=600, show_spinner=False,
+               hash_funcs={dict: lambda d: (d["id"], d.get("modifiedTime"), d.get("name"))})
 def extract_text_for(meta: dict) -> str:
     """Universal extractor for Docs, Slides->PDF, Sheets->CSV, PDF, DOCX, TXT."""
     svc = _drive()
@@ -36,24 +51,23 @@ def extract_text_for(meta: dict) -> str:
 
     elif mime == "application/vnd.google-apps.presentation":
         data = _download(svc.files().export_media(fileId=fid, mimeType="application/pdf"))
-        text = pdf_extract_text(io.BytesIO(data))[:MAX_BYTES]
+        text = _pdf_to_text(data)
         body = text or "[No selectable text in slides export. (OCR is an optional addon.)]"
 
     elif mime == "application/vnd.google-apps.spreadsheet":
         data = _download(svc.files().export_media(fileId=fid, mimeType="text/csv"))
-        csv_text = data[:MAX_BYTES].decode("utf-8", "replace")
-        lines = csv_text.splitlines()
+        # Decode lazily, line by line, and stop at the row cap
         preview = []
-        for i, line in enumerate(lines):
+        for i, line in enumerate(io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="replace")):
             if i > 1000:
                 preview.append("...[truncated additional rows]...")
                 break
-            preview.append(line.replace(",", "\t"))
+            preview.append(line.rstrip("\n").replace(",", "\t"))
         body = "\n".join(preview)
 
     elif mime == "application/pdf":
         data = _download(svc.files().get_media(fileId=fid))
-        text = pdf_extract_text(io.BytesIO(data))[:MAX_BYTES]
+        text = _pdf_to_text(data)
         body = text or "[No selectable text; PDF may be scanned. (OCR optional addon.)]"
 
     elif mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
@@ -81,16 +95,24 @@ def extract_text_for(meta: dict) -> str:
 
     return head + (body or "[No text found]")
 
+@st.cache_data(ttl=60, show_spinner=False)
 def list_recent(n=10):
     svc = _drive()
     res = svc.files().list(pageSize=n, orderBy="modifiedTime desc",
-                           q="trashed=false",
+                           q="trashed=false", corpora="user", spaces="drive",
                            fields="files(id,name,mimeType,modifiedTime)").execute()
     return res.get("files", [])
 
+def _q_literal(s):
+    # Drive query string literal: escape backslashes and single quotes
+    return s.replace("\\", "\\\\").replace("'", "\\'")
+
+@st.cache_data(ttl=60, show_spinner=False)
 def search_files(q, n=15):
     svc = _drive()
+    q = _q_literal(q)
     res = svc.files().list(q=f"(name contains '{q}' or fullText contains '{q}') and trashed=false",
+                           corpora="user", spaces="drive",
                            pageSize=n, fields="files(id,name,mimeType,modifiedTime)").execute()
     return res.get("files", [])
 
@@ -1,16 +1,16 @@
 # mcp-gdrive/drive_core.py
-import io, pathlib
-from typing import Dict, Any, Tuple, List
+import io, os, csv, pathlib, tempfile, threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Tuple, List, Optional
+import requests
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 
-import chardet
-from pypdf import PdfReader
-from docx import Document as DocxDocument
-from pptx import Presentation as PptxPresentation
-import pandas as pd
+# Extraction libraries (charset-normalizer, PyMuPDF, python-docx, python-pptx, openpyxl) are imported
+# inside their extractors: a request only pays for the formats it actually touches.
 
 ROOT = pathlib.Path(__file__).resolve().parent
 TOKEN_PATH = ROOT / "token.json"
@@ -23,102 +23,292 @@ EXPORT_MAP = {
     "application/vnd.google-apps.presentation": "text/plain",
 }
 
+# token.json is read once; the same Credentials object is refreshed in place when it expires,
+# so cached service clients (which hold a reference to it) pick up the new token.
+_CREDS = None
+_creds_lock = threading.Lock()
+# httplib2 (under googleapiclient) isn't thread-safe, so each thread gets its own client
+_local = threading.local()
+
 def _creds() -> Credentials:
-    if not TOKEN_PATH.exists():
-        raise RuntimeError("Missing token.json. Run auth_setup.py.")
-    c = Credentials.from_authorized_user_file(str(TOKEN_PATH), SCOPES)
-    if not c.valid:
-        if c.expired and c.refresh_token:
-            c.refresh(Request()); TOKEN_PATH.write_text(c.to_json())
-        else:
-            raise RuntimeError("Re-run auth_setup.py.")
-    return c
+    global _CREDS
+    with _creds_lock:
+        c = _CREDS
+        if c is None:
+            if not TOKEN_PATH.exists():
+                raise RuntimeError("Missing token.json. Run auth_setup.py.")
+            c = Credentials.from_authorized_user_file(str(TOKEN_PATH), SCOPES)
+        if not c.valid:
+            if c.expired and c.refresh_token:
+                c.refresh(Request()); TOKEN_PATH.write_text(c.to_json())
+            else:
+                raise RuntimeError("Re-run auth_setup.py.")
+        _CREDS = c
+        return c
 
 def _drive():
-    return build("drive", "v3", credentials=_creds(), cache_discovery=False)
+    c = _creds()
+    svc = getattr(_local, "svc", None)
+    if svc is None:
+        # static_discovery: use the discovery doc bundled with googleapiclient, no network fetch
+        svc = _local.svc = build("drive", "v3", credentials=c, cache_discovery=False, static_discovery=True)
+    return svc
+
+def _web_view_link(file_id: str) -> str:
+    return f"https://drive.google.com/open?id={file_id}"
 
 def search_files(query: str, page_size: int = 25) -> List[Dict[str, Any]]:
     svc = _drive()
     resp = svc.files().list(
-        q=query, pageSize=page_size,
-        fields="files(id,name,mimeType,modifiedTime,webViewLink)"
+        q=query, pageSize=page_size, spaces="drive", corpora="user", supportsAllDrives=False,
+        fields="files(id,name,mimeType,modifiedTime)"
     ).execute()
-    return resp.get("files", [])
+    files = resp.get("files", [])
+    # webViewLink is synthesized server-side; building it here keeps the list call cheaper
+    for f in files:
+        f["webViewLink"] = _web_view_link(f["id"])
+    return files
+
+META_FIELDS = "id,name,mimeType,size,owners,modifiedTime,parents,webViewLink"
+BATCH_MAX_CALLS = 100  # Drive's batch endpoint limit
 
 def get_metadata(file_id: str) -> Dict[str, Any]:
     svc = _drive()
-    return svc.files().get(
-        fileId=file_id,
-        fields="id,name,mimeType,size,owners,modifiedTime,parents,webViewLink"
-    ).execute()
+    return svc.files().get(fileId=file_id, fields=META_FIELDS).execute()
+
+def get_metadata_many(file_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """files.get for many ids over one batch HTTP request; ids that fail are left out."""
+    svc = _drive()
+    out: Dict[str, Dict[str, Any]] = {}
+    def _collect(request_id, response, exception):
+        if exception is None:
+            out[request_id] = response
+    ids = list(dict.fromkeys(file_ids))  # batch request ids must be unique
+    for start in range(0, len(ids), BATCH_MAX_CALLS):
+        batch = svc.new_batch_http_request(callback=_collect)
+        for fid in ids[start:start + BATCH_MAX_CALLS]:
+            batch.add(svc.files().get(fileId=fid, fields=META_FIELDS), request_id=fid)
+        batch.execute()
+    return out
 
 def _export_google_file(file_id: str, export_mime: str) -> bytes:
     svc = _drive()
     return svc.files().export(fileId=file_id, mimeType=export_mime).execute()
 
-def _download_binary(file_id: str) -> Tuple[bytes, str]:
+# Blobs above this size are fetched as parallel HTTP Range slices
+SLICED_MIN_BYTES = 16 * 1024 * 1024
+SLICES = 8
+
+def get_file_bytes_sliced(file_id: str, size: int, n: int = SLICES) -> bytearray:
+    url = f"https://www.googleapis.com/drive/v3/files/{file_id}?alt=media"
+    token = _creds().token
+    buf = bytearray(size)
+    view = memoryview(buf)
+    step = -(-size // n)
+
+    def fetch(lo: int) -> None:
+        hi = min(lo + step, size) - 1
+        r = requests.get(url, headers={"Range": f"bytes={lo}-{hi}", "Authorization": f"Bearer {token}"}, timeout=120)
+        r.raise_for_status()
+        view[lo:hi + 1] = r.content  # raises if the server returned a different length
+
+    with ThreadPoolExecutor(max_workers=n) as ex:
+        list(ex.map(fetch, range(0, size, step)))
+    view.release()
+    # Hand back the presized buffer itself; every extractor accepts a bytearray, and a bytes() copy
+    # would double peak memory on exactly the large files this path is for
+    return buf
+
+def _download_binary(file_id: str, mime: str, size: int) -> Tuple[bytes, str]:
     svc = _drive()
-    meta = svc.files().get(fileId=file_id, fields="mimeType").execute()
-    mime = meta["mimeType"]
-    req = svc.files().get_media(fileId=file_id)
-    buf = io.BytesIO()
-    downloader = MediaIoBaseDownload(buf, req)
-    done = False
-    while not done:
-        status, done = downloader.next_chunk()
-    return buf.getvalue(), mime
-
-def get_file_bytes(file_id: str) -> Tuple[bytes, str]:
-    meta = get_metadata(file_id)
+    if size > SLICED_MIN_BYTES:
+        return get_file_bytes_sliced(file_id, size), mime
+    # One GET for the whole body: no MediaIoBaseDownload chunk loop or BytesIO copy
+    return svc.files().get_media(fileId=file_id).execute(), mime
+
+def get_file_bytes(file_id: str, meta: Optional[Dict[str, Any]] = None) -> Tuple[bytes, str]:
+    meta = meta or get_metadata(file_id)
     mime = meta["mimeType"]
     if mime.startswith(GOOGLE_APPS_PREFIX):
         export_mime = EXPORT_MAP.get(mime, "application/pdf")
         return _export_google_file(file_id, export_mime), export_mime
-    return _download_binary(file_id)
+    # mimeType and size are already in META_FIELDS: no second files.get before the download
+    return _download_binary(file_id, mime, int(meta.get("size") or 0))
 
 # --- extraction ---
+CHARSET_SAMPLE_BYTES = 64 * 1024
+
 def _detect_text_bytes(b: bytes) -> str:
-    enc = chardet.detect(b).get("encoding") or "utf-8"
+    # Fast paths: BOMs, then plain UTF-8 (what Drive exports almost always are)
+    if b.startswith(b"\xef\xbb\xbf"): return b[3:].decode("utf-8", errors="replace")
+    if b.startswith((b"\xff\xfe", b"\xfe\xff")): return b.decode("utf-16", errors="replace")
+    try: return b.decode("utf-8")
+    except UnicodeDecodeError: pass
+    # Only guess the encoding from a sample, not the whole buffer
+    from charset_normalizer import from_bytes
+    best = from_bytes(b[:CHARSET_SAMPLE_BYTES]).best()
+    enc = (best.encoding if best else None) or "utf-8"
     try: return b.decode(enc, errors="replace")
     except Exception: return b.decode("utf-8", errors="replace")
 
-def _pdf_to_text(b: bytes) -> str:
-    reader = PdfReader(io.BytesIO(b))
-    return "\n".join([(p.extract_text() or "") for p in reader.pages]).strip() or "[No extractable text in PDF]"
+# Very long PDFs are split into page ranges extracted in worker processes. PyMuPDF is not
+# thread-safe, so a process pool (each worker opens its own Document) rather than threads.
+# PyMuPDF gets through short documents faster than a pool round trip, hence the high threshold.
+PDF_PARALLEL_MIN_PAGES = 300
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # Workers come from a clean server process, never fork() of this threaded one
+            # (Streamlit, to_thread, prefetch pools), which can deadlock on inherited locks.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pdf_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                            mp_context=multiprocessing.get_context(method))
+        return _pdf_pool
+
+def _open_pdf(src):
+    import fitz  # PyMuPDF
+    # a path (parallel workers) or the bytes themselves (in-process)
+    return fitz.open(src) if isinstance(src, str) else fitz.open(stream=src, filetype="pdf")
+
+def _write_pages(pages, max_chars: Optional[int] = None) -> str:
+    # One write pass per page instead of collecting a list and joining it;
+    # stops reading pages once past max_chars
+    buf = io.StringIO()
+    for page in pages:
+        buf.write(page.get_text("text"))
+        buf.write("\n")
+        if max_chars is not None and buf.tell() > max_chars: break
+    return buf.getvalue()
+
+def _pdf_pages_to_text(args: Tuple[Any, int, int, Optional[int]]) -> str:
+    src, start, stop, max_chars = args
+    with _open_pdf(src) as doc:
+        return _write_pages((doc.load_page(i) for i in range(start, stop)), max_chars)
 
-def _docx_to_text(b: bytes) -> str:
+def _pdf_pages_parallel(b: bytes, n: int, max_chars: Optional[int]) -> str:
+    workers = os.cpu_count() or 1
+    step = max(-(-n // workers), PDF_PARALLEL_MIN_PAGES // 2)
+    # Workers read the PDF from one temp file instead of each range pickling its own copy
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(b)
+        pool = _get_pdf_pool()
+        futures = [pool.submit(_pdf_pages_to_text, (path, lo, min(lo + step, n), max_chars))
+                   for lo in range(0, n, step)]
+        buf = io.StringIO()
+        try:
+            for fut in futures:  # in page order; each range already ends in "\n"
+                buf.write(fut.result())
+                if max_chars is not None and buf.tell() > max_chars: break
+        finally:
+            for fut in futures:
+                fut.cancel()  # ranges past the cap that haven't started yet
+        return buf.getvalue()
+    finally:
+        os.unlink(path)
+
+def _pdf_to_text(b: bytes, max_chars: Optional[int] = None) -> str:
+    with _open_pdf(b) as doc:
+        n = doc.page_count
+        text = _write_pages(doc, max_chars) if n <= PDF_PARALLEL_MIN_PAGES else None
+    if text is None:
+        try:
+            text = _pdf_pages_parallel(b, n, max_chars)
+        except BrokenProcessPool:
+            global _pdf_pool
+            with _pdf_pool_lock:
+                _pdf_pool = None  # a worker died; start a fresh pool next time
+            text = _pdf_pages_to_text((b, 0, n, max_chars))
+    return text.strip() or "[No extractable text in PDF]"
+
+# Extractors that take max_chars stop once they hold more than that, so
+# truncate_text still sees the overflow and marks the result as truncated.
+def _docx_to_text(b: bytes, max_chars: Optional[int] = None) -> str:
+    from docx import Document as DocxDocument
     with io.BytesIO(b) as bio: doc = DocxDocument(bio)
-    return "\n".join([p.text for p in doc.paragraphs]).strip()
+    out, n = [], 0
+    for p in doc.paragraphs:
+        t = p.text
+        out.append(t)
+        n += len(t) + 1
+        if max_chars is not None and n > max_chars: break
+    return "\n".join(out).strip()
 
-def _pptx_to_text(b: bytes) -> str:
+def _pptx_to_text(b: bytes, max_chars: Optional[int] = None) -> str:
+    from pptx import Presentation as PptxPresentation
     with io.BytesIO(b) as bio: pres = PptxPresentation(bio)
-    texts = []
+    buf = io.StringIO()
     for slide in pres.slides:
         for sh in slide.shapes:
-            if hasattr(sh, "text"): texts.append(sh.text)
-    return "\n".join(texts).strip() or "[No text found in slides]"
+            t = getattr(sh, "text", None)
+            if t:
+                buf.write(t); buf.write("\n")
+        if max_chars is not None and buf.tell() > max_chars: break
+    return buf.getvalue().strip() or "[No text found in slides]"
 
 def _xlsx_to_text(b: bytes) -> str:
-    with io.BytesIO(b) as bio: xl = pd.ExcelFile(bio)
+    from openpyxl import load_workbook
+    # read_only streams rows from the XML instead of loading whole sheets
+    wb = load_workbook(io.BytesIO(b), read_only=True, data_only=True)
     parts = []
-    for name in xl.sheet_names:
-        df = xl.parse(name).head(50)
-        parts.append(f"# Sheet: {name}\n" + df.to_csv(index=False))
+    try:
+        for ws in wb.worksheets:
+            out = io.StringIO()
+            w = csv.writer(out, lineterminator="\n")
+            for row in ws.iter_rows(max_row=51, values_only=True):  # header + 50 rows
+                w.writerow(["" if v is None else v for v in row])
+            parts.append(f"# Sheet: {ws.title}\n" + out.getvalue())
+    finally:
+        wb.close()
     return "\n\n".join(parts)
 
-def bytes_to_text(b: bytes, mime: str) -> str:
+def bytes_to_text(b: bytes, mime: str, max_chars: Optional[int] = None) -> str:
     mime = (mime or "").lower()
-    if mime == "application/pdf": return _pdf_to_text(b)
+    if mime == "application/pdf": return _pdf_to_text(b, max_chars)
     if mime in ("text/plain","text/markdown","application/json","text/html","application/vnd.google-apps.script+json"):
         return _detect_text_bytes(b)
     if mime in ("text/csv","text/tab-separated-values"): return _detect_text_bytes(b)
-    if mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document": return _docx_to_text(b)
-    if mime == "application/vnd.openxmlformats-officedocument.presentationml.presentation": return _pptx_to_text(b)
+    if mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document": return _docx_to_text(b, max_chars)
+    if mime == "application/vnd.openxmlformats-officedocument.presentationml.presentation": return _pptx_to_text(b, max_chars)
     if mime == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": return _xlsx_to_text(b)
     txt = _detect_text_bytes(b)
     return txt if txt.strip() else f"[Unsupported or binary type: {mime or 'unknown'}]"
 
-def get_text(file_id: str, max_chars: int = 60_000) -> str:
-    b, mime = get_file_bytes(file_id)
-    t = bytes_to_text(b, mime)
+def truncate_text(t: str, max_chars: int) -> str:
     return (t[:max_chars] + "\n[Truncated]") if len(t) > max_chars else t
+
+# Extracted text is cached on disk keyed by modifiedTime, so an edited file misses automatically.
+# Set MCP_GDRIVE_NO_CACHE=1 to bypass; without diskcache installed the cache is simply off.
+TEXT_CACHE_DIR = pathlib.Path(os.environ.get("MCP_GDRIVE_CACHE_DIR", "~/.cache/mcp-gdrive")).expanduser()
+TEXT_CACHE_TTL = 24 * 3600
+_text_cache = None
+
+def _get_text_cache():
+    global _text_cache
+    if _text_cache is None and not os.environ.get("MCP_GDRIVE_NO_CACHE"):
+        try:
+            from diskcache import Cache
+        except ImportError:
+            return None
+        _text_cache = Cache(str(TEXT_CACHE_DIR))
+    return _text_cache
+
+def get_text(file_id: str, max_chars: int = 60_000, meta: Optional[Dict[str, Any]] = None) -> str:
+    # Callers that already hold the file's META_FIELDS metadata pass it in to skip the files.get
+    meta = meta or get_metadata(file_id)
+    cache = _get_text_cache()
+    key = f"{file_id}:{meta.get('modifiedTime')}:{max_chars}"
+    if cache is not None:
+        text = cache.get(key)
+        if text is not None:
+            return text
+    b, mime = get_file_bytes(file_id, meta)
+    text = truncate_text(bytes_to_text(b, mime, max_chars), max_chars)
+    if cache is not None:
+        cache.set(key, text, expire=TEXT_CACHE_TTL)
+    return text
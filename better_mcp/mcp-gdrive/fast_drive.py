@@ -0,0 +1,55 @@
+# mcp-gdrive/fast_drive.py
+# Concurrent Drive reads over aiohttp: metadata + download/export for many files at once,
+# sharing one session and a bounded number of in-flight requests.
+import asyncio
+from typing import Dict, Any, List, Tuple
+
+import aiohttp
+
+from drive_core import (_creds, _get_text_cache, bytes_to_text, truncate_text,
+                        GOOGLE_APPS_PREFIX, EXPORT_MAP, META_FIELDS, TEXT_CACHE_TTL)
+
+FILES_URL = "https://www.googleapis.com/drive/v3/files"
+MAX_CONCURRENCY = 16
+
+async def _get_json(session: aiohttp.ClientSession, sem: asyncio.Semaphore, url: str, params: Dict[str, str]) -> Dict[str, Any]:
+    async with sem, session.get(url, params=params) as r:
+        r.raise_for_status()
+        return await r.json()
+
+async def _get_bytes(session: aiohttp.ClientSession, sem: asyncio.Semaphore, url: str, params: Dict[str, str]) -> bytes:
+    async with sem, session.get(url, params=params) as r:
+        r.raise_for_status()
+        return await r.read()
+
+async def _get_one(session: aiohttp.ClientSession, sem: asyncio.Semaphore, file_id: str, max_chars: int) -> Dict[str, Any]:
+    meta = await _get_json(session, sem, f"{FILES_URL}/{file_id}", {"fields": META_FIELDS})
+    # Same on-disk text cache and key as drive_core.get_text
+    cache = _get_text_cache()
+    key = f"{file_id}:{meta.get('modifiedTime')}:{max_chars}"
+    if cache is not None:
+        text = await asyncio.to_thread(cache.get, key)
+        if text is not None:
+            return {"file_id": file_id, "meta": meta, "text": text}
+    mime = meta["mimeType"]
+    if mime.startswith(GOOGLE_APPS_PREFIX):
+        mime = EXPORT_MAP.get(mime, "application/pdf")
+        b = await _get_bytes(session, sem, f"{FILES_URL}/{file_id}/export", {"mimeType": mime})
+    else:
+        b = await _get_bytes(session, sem, f"{FILES_URL}/{file_id}", {"alt": "media"})
+    # Extraction is CPU work; keep it off the event loop so other downloads keep flowing
+    text = await asyncio.to_thread(bytes_to_text, b, mime, max_chars)
+    text = truncate_text(text, max_chars)
+    if cache is not None:
+        await asyncio.to_thread(cache.set, key, text, expire=TEXT_CACHE_TTL)
+    return {"file_id": file_id, "meta": meta, "text": text}
+
+async def get_texts(requests: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    """[(file_id, max_chars), ...] -> payloads in the same order; failures become {"error": ...}."""
+    token = await asyncio.to_thread(lambda: _creds().token)
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    async with aiohttp.ClientSession(headers={"Authorization": f"Bearer {token}"}) as session:
+        results = await asyncio.gather(
+            *(_get_one(session, sem, fid, mx) for fid, mx in requests), return_exceptions=True
+        )
+    return [{"error": str(r)} if isinstance(r, Exception) else r for r in results]
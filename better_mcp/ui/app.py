@@ -1,5 +1,6 @@
-import os, sys, json, pathlib
-from typing import List, Dict, Any
+import os, sys, json, asyncio, pathlib
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Any, Tuple
 import streamlit as st
 import anthropic
 
@@ -7,7 +8,18 @@ import anthropic
 ROOT = pathlib.Path(__file__).resolve().parent
 sys.path.append(str(ROOT.parent / "mcp-gdrive"))
 
-from drive_core import search_files as drv_search, get_text as drv_get_text, get_metadata as drv_meta
+from drive_core import search_files as drv_search, get_text as drv_get_text, get_metadata as drv_meta, get_metadata_many as drv_meta_many
+try:
+    from fast_drive import get_texts as fast_get_texts
+except ImportError:  # aiohttp missing: every read goes through the blocking drive_core path
+    fast_get_texts = None
+try:
+    import orjson
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str).decode()
+except ImportError:
+    def _dumps(obj) -> str:
+        return json.dumps(obj, default=str)
 
 st.set_page_config(page_title="Claude + Drive", page_icon="💬", layout="wide")
 
@@ -45,6 +57,61 @@ anthropic_tools = [
     }
 ]
 
+# After a search, the next round usually reads the top hit: start that read while Claude is thinking.
+SPECULATIVE_MAX_CHARS = 60000
+# Only document types are worth guessing at; a video or archive would be a large download nobody asked for
+SPECULATIVE_MIME_PREFIXES = (
+    "application/vnd.google-apps.", "text/", "application/pdf", "application/json",
+    "application/vnd.openxmlformats-officedocument.",
+)
+
+@st.cache_resource
+def _speculative_pool() -> ThreadPoolExecutor:
+    # One pool for the process; Streamlit re-executes this script on every interaction
+    return ThreadPoolExecutor(max_workers=2)
+
+def _speculate_top_hit(results, speculated: Dict[Tuple[str, int], Future]) -> None:
+    if results and results[0].get("mimeType", "").startswith(SPECULATIVE_MIME_PREFIXES):
+        key = (results[0]["id"], SPECULATIVE_MAX_CHARS)
+        if key not in speculated:
+            speculated[key] = _speculative_pool().submit(drv_get_text, *key)
+
+def _text_request(block):
+    """(file_id, max_chars) for a gdrive_get_text block, or None if its input doesn't parse;
+    such blocks are left to the per-call path, which reports the error for that tool only."""
+    args = block.input or {}
+    try:
+        return args["file_id"], int(args.get("max_chars", 60000))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def _get_texts_concurrently(blocks, speculated=()) -> Dict[str, Dict[str, Any]]:
+    """Fetch every gdrive_get_text call of one Claude turn at once. Returns {tool_use_id: payload}."""
+    calls, reqs = [], []
+    for b in blocks:
+        req = _text_request(b) if b.name == "gdrive_get_text" else None
+        if req is not None and req not in speculated:
+            calls.append(b); reqs.append(req)
+    if fast_get_texts is None or len(calls) < 2:
+        return {}
+    try:
+        payloads = asyncio.run(fast_get_texts(reqs))
+    except Exception:
+        return {}  # fall back to the sequential path for this turn
+    return {b.id: p for b, p in zip(calls, payloads)}
+
+def _get_metas_batched(blocks, prefetched) -> Dict[str, Dict[str, Any]]:
+    """One batch files.get for the gdrive_get_text calls the concurrent path didn't cover.
+    The metadata is handed to drv_get_text, so each file's metadata is fetched once."""
+    ids = [b.input["file_id"] for b in blocks
+           if b.name == "gdrive_get_text" and b.id not in prefetched and "file_id" in (b.input or {})]
+    if len(ids) < 2:
+        return {}  # a batch of one is just a files.get with extra framing; drv_meta below
+    try:
+        return drv_meta_many(ids)
+    except Exception:
+        return {}  # per-call drv_meta below
+
 def run_claude_with_tools(history: List[Dict[str,str]], system_prompt: str) -> str:
     key = os.getenv("ANTHROPIC_API_KEY")
     if not key:
@@ -52,44 +119,57 @@ def run_claude_with_tools(history: List[Dict[str,str]], system_prompt: str) -> s
     client = anthropic.Anthropic(api_key=key)
     msgs = [{"role": m["role"], "content": m["content"]} for m in history]
     tool_results: List[Dict[str,Any]] = []
-    for _ in range(4):
-        resp = client.messages.create(
-            model=os.getenv("ANTHROPIC_MODEL", ANTH_MODEL_DEFAULT),
-            system=system_prompt,
-            max_tokens=1400,
-            temperature=0.2,
-            tools=anthropic_tools,
-            messages=msgs + tool_results
-        )
-        made_tool_call, out_text = False, []
-        for block in resp.content:
-            if block.type == "text":
-                out_text.append(block.text)
-            elif block.type == "tool_use":
-                made_tool_call = True
-                name, args, tool_id = block.name, (block.input or {}), block.id
-                st.session_state["tool_events"].append(f"▶ {name} {args}")
-                try:
-                    if name == "gdrive_search":
-                        res = drv_search(args.get("query",""), page_size=int(args.get("page_size",10)))
-                        payload = {"results": res}
-                    elif name == "gdrive_get_text":
-                        fid = args["file_id"]; mx = int(args.get("max_chars",60000))
-                        txt = drv_get_text(fid, max_chars=mx); meta = drv_meta(fid)
-                        payload = {"file_id": fid, "meta": meta, "text": txt}
-                    else:
-                        payload = {"error": f"unknown tool {name}"}
-                except Exception as e:
-                    payload = {"error": str(e)}
-                preview = json.dumps(payload)[:500]
-                st.session_state["tool_events"].append(f"◀ result {preview}{' ...' if len(json.dumps(payload))>500 else ''}")
-                tool_results.append({
-                    "role":"tool","tool_use_id":tool_id,
-                    "content":[{"type":"tool_result","content":json.dumps(payload)[:100000]}]
-                })
-        if not made_tool_call:
-            return "".join(out_text).strip() or "[No content]"
-    return "[Too many tool rounds without a final answer]"
+    speculated: Dict[Tuple[str, int], Future] = {}
+    try:
+        for _ in range(4):
+            resp = client.messages.create(
+                model=os.getenv("ANTHROPIC_MODEL", ANTH_MODEL_DEFAULT),
+                system=system_prompt,
+                max_tokens=1400,
+                temperature=0.2,
+                tools=anthropic_tools,
+                messages=msgs + tool_results
+            )
+            made_tool_call, out_text = False, []
+            tool_blocks = [b for b in resp.content if b.type == "tool_use"]
+            prefetched = _get_texts_concurrently(tool_blocks, speculated)
+            metas = _get_metas_batched(tool_blocks, prefetched)
+            for block in resp.content:
+                if block.type == "text":
+                    out_text.append(block.text)
+                elif block.type == "tool_use":
+                    made_tool_call = True
+                    name, args, tool_id = block.name, (block.input or {}), block.id
+                    st.session_state["tool_events"].append(f"▶ {name} {args}")
+                    try:
+                        if tool_id in prefetched:
+                            payload = prefetched[tool_id]
+                        elif name == "gdrive_search":
+                            res = drv_search(args.get("query",""), page_size=int(args.get("page_size",10)))
+                            payload = {"results": res}
+                            _speculate_top_hit(res, speculated)
+                        elif name == "gdrive_get_text":
+                            fid = args["file_id"]; mx = int(args.get("max_chars",60000))
+                            fut = speculated.pop((fid, mx), None)
+                            meta = metas.get(fid) or drv_meta(fid)
+                            txt = fut.result() if fut is not None else drv_get_text(fid, max_chars=mx, meta=meta)
+                            payload = {"file_id": fid, "meta": meta, "text": txt}
+                        else:
+                            payload = {"error": f"unknown tool {name}"}
+                    except Exception as e:
+                        payload = {"error": str(e)}
+                    blob = _dumps(payload)  # serialize once; preview and result are slices of it
+                    st.session_state["tool_events"].append(f"◀ result {blob[:500]}{' ...' if len(blob)>500 else ''}")
+                    tool_results.append({
+                        "role":"tool","tool_use_id":tool_id,
+                        "content":[{"type":"tool_result","content":blob[:100000]}]
+                    })
+            if not made_tool_call:
+                return "".join(out_text).strip() or "[No content]"
+        return "[Too many tool rounds without a final answer]"
+    finally:
+        for fut in speculated.values():
+            fut.cancel()  # Claude never asked for it; drop if not started yet
 
 # sidebar
 with st.sidebar:
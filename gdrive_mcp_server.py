@@ -1,9 +1,8 @@
 # ~/mcp-gdrive/gdrive_mcp_server.py
-import io, os, logging
+import io, os, time, signal, logging, threading
 from pathlib import Path
 from mcp.server.fastmcp import FastMCP
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 
@@ -15,21 +14,36 @@ TOKEN_PATH = Path("/Users/sharvaripurighalla/mcp-gdrive/token.json")
 CREDS_PATH = Path("/Users/sharvaripurighalla/mcp-gdrive/credentials.json")
 SCOPES = ["https://www.googleapis.com/auth/drive.readonly"]
 
+# Credentials are loaded once and refreshed in place; the Drive client is built once per
+# thread (httplib2 isn't thread-safe) instead of on every tool call.
+_CREDS = None
+_creds_lock = threading.Lock()
+_local = threading.local()
+
 def _creds():
-    logging.info(f"[gdrive] using TOKEN_PATH={TOKEN_PATH}")
-    if not TOKEN_PATH.exists():
-        raise RuntimeError(f"Run `python auth_setup.py` first. Missing: {TOKEN_PATH}")
-    c = Credentials.from_authorized_user_file(str(TOKEN_PATH), SCOPES)
-    if not c.valid:
-        if c.expired and c.refresh_token:
-            c.refresh(Request())
-            TOKEN_PATH.write_text(c.to_json())
-        else:
-            raise RuntimeError("Credentials invalid. Delete token.json and re-run auth_setup.py")
-    return c
+    global _CREDS
+    with _creds_lock:
+        c = _CREDS
+        if c is None:
+            logging.info(f"[gdrive] using TOKEN_PATH={TOKEN_PATH}")
+            if not TOKEN_PATH.exists():
+                raise RuntimeError(f"Run `python auth_setup.py` first. Missing: {TOKEN_PATH}")
+            c = Credentials.from_authorized_user_file(str(TOKEN_PATH), SCOPES)
+        if not c.valid:
+            if c.expired and c.refresh_token:
+                c.refresh(Request())
+                TOKEN_PATH.write_text(c.to_json())
+            else:
+                raise RuntimeError("Credentials invalid. Delete token.json and re-run auth_setup.py")
+        _CREDS = c
+        return c
 
 def _svc():
-    return build("drive", "v3", credentials=_creds())
+    c = _creds()
+    svc = getattr(_local, "svc", None)
+    if svc is None:
+        svc = _local.svc = build("drive", "v3", credentials=c, cache_discovery=False, static_discovery=True)
+    return svc
 
 def _link(fid: str) -> str:
     return f"https://drive.google.com/open?id={fid}"
@@ -48,11 +62,17 @@ def list_recent_files(limit: int = 5) -> str:
         return "No files found."
     return "\n".join(f"- {f['name']} [id:{f['id']}] ({f['mimeType']}) → {_link(f['id'])}" for f in items)
 
+def _q_literal(s: str) -> str:
+    # Drive query string literal: escape backslashes and single quotes
+    return s.replace("\\", "\\\\").replace("'", "\\'")
+
 @mcp.tool()
 def search_files(query: str, limit: int = 5) -> str:
     """Search by name or contents."""
-    q = f"(name contains '{query}' or fullText contains '{query}') and trashed=false"
-    res = _svc().files().list(q=q, pageSize=limit, fields="files(id,name,mimeType)").execute()
+    lit = _q_literal(query)
+    q = f"(name contains '{lit}' or fullText contains '{lit}') and trashed=false"
+    res = _svc().files().list(q=q, corpora="user", spaces="drive",
+                              pageSize=limit, fields="files(id,name,mimeType)").execute()
     items = res.get("files", [])
     if not items:
         return f"No matches for {query!r}."
@@ -64,21 +84,16 @@ def get_file_text(file_id: str, max_bytes: int = 40000) -> str:
     s = _svc()
     meta = s.files().get(fileId=file_id, fields="id,name,mimeType").execute()
     mime, name = meta["mimeType"], meta["name"]
-    buf = io.BytesIO()
     if mime == "application/vnd.google-apps.document":
         req = s.files().export_media(fileId=file_id, mimeType="text/plain")
     elif mime == "text/plain":
         req = s.files().get_media(fileId=file_id)
     else:
         return f"Unsupported for text extraction: {name} ({mime})."
-    dl = MediaIoBaseDownload(buf, req)
-    done = False
-    while not done:
-        _, done = dl.next_chunk()
-    data = buf.getvalue()[:max_bytes]
-    text = data.decode("utf-8", errors="replace")
+    raw = req.execute()  # single-shot download
+    text = raw[:max_bytes].decode("utf-8", errors="replace")
     head = f"# {name}\n\n"
-    if len(buf.getvalue()) > max_bytes:
+    if len(raw) > max_bytes:
         head += f"(Truncated to ~{max_bytes} bytes)\n\n"
     return head + text
 
@@ -108,19 +123,14 @@ def get_file_text_universal(file_id: str, max_bytes: int = 120_000) -> str:
     Returns a header + body. Truncates to ~max_bytes to stay chat-friendly.
     """
     import io
-    from googleapiclient.http import MediaIoBaseDownload
-    from pdfminer.high_level import extract_text as pdf_extract_text
 
     s = _svc()
     meta = s.files().get(fileId=file_id, fields="id,name,mimeType").execute()
     name, mime = meta["name"], meta["mimeType"]
 
-    buf = io.BytesIO()
-
     def _download(req):
-        # Simple one-chunk download 
-        MediaIoBaseDownload(buf, req).next_chunk()
-        return buf.getvalue()
+        # Single-shot download of the whole body
+        return req.execute()
 
     def _as_text(b: bytes) -> str:
         return b[:max_bytes].decode("utf-8", errors="replace")
@@ -133,7 +143,7 @@ def get_file_text_universal(file_id: str, max_bytes: int = 120_000) -> str:
     elif mime == "application/vnd.google-apps.presentation":
         # Export to PDF and extract text
         data = _download(s.files().export_media(fileId=file_id, mimeType="application/pdf"))
-        text = pdf_extract_text(io.BytesIO(data))[:max_bytes]
+        text = _pdf_to_text(data, max_bytes)
         if not text.strip():
             text = "[No selectable text found in exported Slides PDF. It may be image-based; enable OCR to read images.]"
         body = text
@@ -141,21 +151,20 @@ def get_file_text_universal(file_id: str, max_bytes: int = 120_000) -> str:
     elif mime == "application/vnd.google-apps.spreadsheet":
         # Export CSV (first sheet) and render as TSV-ish preview
         data = _download(s.files().export_media(fileId=file_id, mimeType="text/csv"))
-        csv_text = _as_text(data)
-        # Make it readable in chat: replace commas with tabs, cap rows
-        lines = csv_text.splitlines()
+        # Make it readable in chat: replace commas with tabs, cap rows.
+        # Lines are decoded lazily, so nothing past the row cap is decoded or split.
         preview_rows = []
-        for i, line in enumerate(lines):
+        for i, line in enumerate(io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="replace")):
             if i > 1000:
                 preview_rows.append("...[truncated additional rows]...")
                 break
-            preview_rows.append(line.replace(",", "\t"))
+            preview_rows.append(line.rstrip("\n").replace(",", "\t"))
         body = "\n".join(preview_rows)
 
     # ---- Binary/stored files
     elif mime == "application/pdf":
         data = _download(s.files().get_media(fileId=file_id))
-        text = pdf_extract_text(io.BytesIO(data))[:max_bytes]
+        text = _pdf_to_text(data, max_bytes)
         if not text.strip():
             text = "[No selectable text extracted; PDF may be scanned. Enable OCR to read images.]"
         body = text
@@ -190,16 +199,73 @@ def get_file_text_universal(file_id: str, max_bytes: int = 120_000) -> str:
     header = f"# {name} [{mime}]\n\n"
     return header + (body or "[No text found]")
 
+PDF_TIME_BUDGET = 30.0  # seconds of pdfminer layout analysis per file
+
+class _PdfTimeout(Exception):
+    pass
+
+def _pdf_to_text(data: bytes, max_bytes: int) -> str:
+    """
+    pdfminer text, page by page, with explicit LAParams.
+    Stops once max_bytes characters are collected or PDF_TIME_BUDGET is spent,
+    so pathological PDFs can't stall the tool call.
+    On the main thread of a Unix process the budget is a hard limit (SIGALRM interrupts
+    even a single slow page); elsewhere it is soft, checked between pages only.
+    """
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LAParams, LTTextContainer
+
+    laparams = LAParams(char_margin=1.0, line_margin=0.3, word_margin=0.1)
+    deadline = time.monotonic() + PDF_TIME_BUDGET
+    parts, total, timed_out = [], 0, False
+    hard = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if hard:
+        def _on_alarm(signum, frame):
+            raise _PdfTimeout()
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, PDF_TIME_BUDGET)
+    try:
+        # extract_pages is lazy: each page is parsed and laid out only when reached
+        for page in extract_pages(io.BytesIO(data), laparams=laparams):
+            text = "".join(el.get_text() for el in page if isinstance(el, LTTextContainer))
+            parts.append(text)
+            total += len(text)
+            if total >= max_bytes:
+                break
+            if time.monotonic() > deadline:
+                timed_out = True
+                break
+    except _PdfTimeout:
+        timed_out = True  # keep the pages finished before the alarm
+    finally:
+        if hard:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    text = "\n".join(parts)[:max_bytes]
+    if timed_out and text.strip():
+        text += f"\n[Stopped after {PDF_TIME_BUDGET:.0f}s; remaining pages skipped]"
+    return text
+
+OCR_MAX_PAGES = 10  # cap for cost/time
+
 def _ocr_pdf_to_text(pdf_bytes: bytes) -> str:
     # Lazy OCR pipeline: PDF -> images -> Tesseract
     from pdf2image import convert_from_bytes
-    import pytesseract
-    from PIL import Image
-    pages = convert_from_bytes(pdf_bytes, dpi=200)
-    parts = []
-    for i, img in enumerate(pages[:10]):  # cap first 10 pages for cost/time
-        parts.append(pytesseract.image_to_string(img))
-    return "\n".join(parts)
+    # Only rasterize the pages we OCR, with poppler splitting the work across cores
+    pages = convert_from_bytes(pdf_bytes, dpi=200, first_page=1, last_page=OCR_MAX_PAGES,
+                               thread_count=os.cpu_count() or 1)
+    try:
+        # tesserocr binds the Tesseract C++ API: one engine for all pages, no process per page
+        from tesserocr import PyTessBaseAPI
+    except ImportError:
+        import pytesseract
+        return "\n".join(pytesseract.image_to_string(img) for img in pages)
+    with PyTessBaseAPI() as api:
+        parts = []
+        for img in pages:
+            api.SetImage(img)
+            parts.append(api.GetUTF8Text())
+        return "\n".join(parts)
 
 if __name__ == "__main__":
     mcp.run(transport="stdio")